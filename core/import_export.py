@@ -224,14 +224,8 @@ def validate_archive_quick(zip_path, tail_number_override=None):
 # ---------------------------------------------------------------------------
 
 def _append_event(job, event_type, message):
-    """Append an event to the job's event log and save."""
-    from health.models import ImportJob
-    event = {'type': event_type, 'message': message}
-    # Atomic append to avoid race conditions with concurrent reads
-    ImportJob.objects.filter(pk=job.pk).update(
-        events=ImportJob.objects.get(pk=job.pk).events + [event]
-    )
-    job.refresh_from_db(fields=['events'])
+    """Append an event to the job's event log."""
+    job.append_events([{'type': event_type, 'message': message}])
 
 
 def _topological_sort_components(components):
@@ -350,10 +344,7 @@ def run_aircraft_import_job(job_id, zip_path, owner_user, tail_number_override=N
         return
 
     def ev(event_type, message):
-        event = {'type': event_type, 'message': message}
-        ImportJob.objects.filter(pk=job.pk).update(
-            events=ImportJob.objects.values_list('events', flat=True).get(pk=job.pk) + [event]
-        )
+        job.append_events([{'type': event_type, 'message': message}])
 
     job.status = 'running'
     job.save(update_fields=['status'])
@@ -121,8 +121,7 @@ class Command(BaseCommand):
             raise CommandError(f"Import failed: {exc}") from exc
         finally:
             # Persist events to the job
-            job.events = events_buffer
-            job.save(update_fields=['events', 'updated_at'])
+            job.append_events(events_buffer)
 
         if job.status == 'failed':
             raise CommandError("Import failed. See errors above.")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-16 12:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aircraft',
+            index=models.Index(django.db.models.functions.text.Upper('tail_number'), name='aircraft_tail_upper_idx'),
+        ),
+    ]
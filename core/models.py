@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Upper
 
 import uuid
 
@@ -45,6 +46,12 @@ class Aircraft(models.Model):
     hobbs_time = models.DecimalField(max_digits=8, decimal_places=1, default=0.0)
     hobbs_time_offset = models.DecimalField(max_digits=8, decimal_places=1, default=0.0)
 
+    class Meta:
+        indexes = [
+            # tail_number__iexact compiles to UPPER(tail_number) on PostgreSQL
+            models.Index(Upper('tail_number'), name='aircraft_tail_upper_idx'),
+        ]
+
     def __str__(self):
         return f"{self.tail_number} - {self.make} {self.model}"
 
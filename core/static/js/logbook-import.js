@@ -314,7 +314,7 @@ function logbookImport() {
         eventClass(event) {
             return {
                 'pf-v5-c-log-viewer__text': true,
-                'sam-log-info':    event.type === 'info' || event.type === 'batch',
+                'sam-log-info':    event.type === 'info' || event.type === 'batch' || event.type === 'batch_status',
                 'sam-log-warning': event.type === 'warning',
                 'sam-log-error':   event.type === 'error',
                 'sam-log-entry':   event.type === 'entry',
@@ -327,6 +327,7 @@ function logbookImport() {
             const icons = {
                 info:     'fa-circle-info',
                 batch:    'fa-layer-group',
+                batch_status: 'fa-hourglass-half',
                 warning:  'fa-triangle-exclamation',
                 error:    'fa-circle-xmark',
                 entry:    'fa-book',
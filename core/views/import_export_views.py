@@ -196,7 +196,7 @@ class ImportJobStatusView(LoginRequiredMixin, View):
 
         return JsonResponse({
             'status': job.status,
-            'events': job.events[after:],
+            'events': job.events_after(after),
             'result': job.result,
         })
 
@@ -100,7 +100,7 @@ class LogbookImportView(LoginRequiredMixin, View):
                     status=400,
                 )
 
-            image_paths = [str(path.relative_to(Path(tmpdir))) for path in image_paths]
+            image_paths = [os.path.relpath(path, tmpdir) for path in image_paths]
             job.save()
 
             # Hand tmpdir ownership to the background worker.
@@ -156,7 +156,7 @@ class LogbookImportView(LoginRequiredMixin, View):
         except (ValueError, TypeError):
             after = 0
 
-        new_events = job.events[after:]
+        new_events = job.events_after(after)
 
         return JsonResponse({
             'status': job.status,
@@ -182,7 +182,7 @@ class LogbookImportView(LoginRequiredMixin, View):
 
     def _prepare_images(self, request, tmpdir: str):
         """
-        Write uploaded files into tmpdir and return a sorted list of image Paths.
+        Write uploaded files into tmpdir and return a sorted list of image paths (str).
         Handles two upload modes:
           - file_mode='images': multiple image files in request.FILES.getlist('images')
           - file_mode='archive': single zip/tar in request.FILES['archive']
@@ -211,12 +211,21 @@ class LogbookImportView(LoginRequiredMixin, View):
                     for chunk in uf.chunks():
                         fh.write(chunk)
 
-        image_paths = sorted(
-            p for p in Path(tmpdir).rglob('*')
-            if p.is_file() and p.suffix.lower() in self._IMAGE_SUFFIXES
-        )
+        # Sort by path components so nested archive folders keep the same page
+        # order Path sorting gave us.
+        image_paths = sorted(self._iter_image_files(tmpdir), key=lambda p: p.split(os.sep))
         return image_paths, None
 
+    def _iter_image_files(self, root: str):
+        """Recursively yield image file paths under root as plain strings."""
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_image_files(entry.path)
+                elif (entry.is_file()
+                      and os.path.splitext(entry.name)[1].lower() in self._IMAGE_SUFFIXES):
+                    yield entry.path
+
     def _extract_archive(self, archive_file, tmpdir: str):
         """
         Extract a zip or tar archive into tmpdir.
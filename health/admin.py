@@ -4,10 +4,27 @@ from .models import *
 # Register your models here.
 
 admin.site.register(ComponentType)
-admin.site.register(Component)
-admin.site.register(DocumentImage)
-admin.site.register(LogbookEntry)
-admin.site.register(Squawk)
+
+# The models below have no list_display, so their changelists render
+# __str__, which follows these relations; list_select_related fetches them
+# in the changelist query instead of one query per row.
+
+@admin.register(Component)
+class ComponentAdmin(admin.ModelAdmin):
+    list_select_related = ('component_type', 'aircraft')
+
+@admin.register(DocumentImage)
+class DocumentImageAdmin(admin.ModelAdmin):
+    list_select_related = ('document',)
+
+@admin.register(LogbookEntry)
+class LogbookEntryAdmin(admin.ModelAdmin):
+    list_select_related = ('aircraft',)
+
+@admin.register(Squawk)
+class SquawkAdmin(admin.ModelAdmin):
+    list_select_related = ('aircraft', 'component__component_type')
+
 admin.site.register(InspectionType)
 admin.site.register(AD)
 from .models import MajorRepairAlteration
@@ -17,9 +34,18 @@ class MajorRepairAlterationAdmin(admin.ModelAdmin):
     list_display = ('title', 'record_type', 'aircraft', 'date_performed', 'component')
     list_filter = ('record_type', 'aircraft')
     search_fields = ('title', 'description', 'stc_number')
-admin.site.register(InspectionRecord)
-admin.site.register(ADCompliance)
-admin.site.register(ConsumableRecord)
+
+@admin.register(InspectionRecord)
+class InspectionRecordAdmin(admin.ModelAdmin):
+    list_select_related = ('inspection_type', 'aircraft')
+
+@admin.register(ADCompliance)
+class ADComplianceAdmin(admin.ModelAdmin):
+    list_select_related = ('ad', 'aircraft', 'component__component_type')
+
+@admin.register(ConsumableRecord)
+class ConsumableRecordAdmin(admin.ModelAdmin):
+    list_select_related = ('aircraft',)
 
 from .models import OilAnalysisReport
 
@@ -20,15 +20,23 @@ Event types:
 """
 
 import base64
+import functools
+import hashlib
 import io
 import json
 import logging
 import os
+import queue
+import random
+import re
 import shutil
+import threading
 import time
-from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from datetime import date, datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Set
+from typing import Iterator, List, Optional, Set, Tuple
 
 from django.core.files import File
 from django.db import transaction
@@ -36,10 +44,10 @@ from django.db import transaction
 from health.models import Document, DocumentCollection, DocumentImage, ImportJob, LogbookEntry
 
 
-SUPPORTED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff'}
+SUPPORTED_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff'})
 
-VALID_LOG_TYPES = {'AC', 'ENG', 'PROP', 'OTHER'}
-VALID_ENTRY_TYPES = {'FLIGHT', 'MAINTENANCE', 'INSPECTION', 'HOURS_UPDATE', 'OTHER'}
+VALID_LOG_TYPES = frozenset({'AC', 'ENG', 'PROP', 'OTHER'})
+VALID_ENTRY_TYPES = frozenset({'FLIGHT', 'MAINTENANCE', 'INSPECTION', 'HOURS_UPDATE', 'OTHER'})
 
 _AI_PROMPTS_DIR = Path(__file__).parent / 'ai_prompts'
 
@@ -53,6 +61,20 @@ def _load_prompt(filename: str) -> str:
 EXTRACT_SYSTEM_PROMPT = _load_prompt('logbook_extract_system_prompt.txt')
 EXTRACT_OUTPUT_SCHEMA = json.loads(_load_prompt('logbook_extract_schema.json'))
 
+# Folded into response cache keys so editing the prompt or schema invalidates them.
+_PROMPT_FINGERPRINT = hashlib.sha256(
+    (EXTRACT_SYSTEM_PROMPT + json.dumps(EXTRACT_OUTPUT_SCHEMA, sort_keys=True)).encode('utf-8')
+).digest()
+
+# Structural facts about the schema, read once, for checking responses from
+# providers that do not enforce it (Ollama, LiteLLM): the top-level lists and
+# the integer-typed entry fields that page arithmetic depends on.
+_EXTRACT_LIST_KEYS = tuple(EXTRACT_OUTPUT_SCHEMA['required'])
+_ENTRY_INT_FIELDS = tuple(
+    name for name, spec in EXTRACT_OUTPUT_SCHEMA['properties']['entries']['items']['properties'].items()
+    if spec.get('type') == 'integer'
+)
+
 
 # ---------------------------------------------------------------------------
 # Public API
@@ -70,6 +92,8 @@ def run_import(
     log_type_override: Optional[str] = None,
     batch_size: int = 10,
     append_to_document_id=None,
+    concurrency: Optional[int] = None,
+    use_batch_api: bool = False,
 ) -> Iterator[dict]:
     """
     Generator.  Yields progress event dicts and creates DB records as a side effect.
@@ -77,7 +101,12 @@ def run_import(
 
     The entire DB write is wrapped in a single transaction; if an exception
     propagates out of the generator the transaction is rolled back automatically.
-    File-system side effects (uploaded images) are not rolled back on failure.
+    Page images are written to storage before the transaction opens, and are
+    deleted again if it fails.
+
+    use_batch_api (anthropic only) submits all page batches as one Message
+    Batches job instead of live requests — half the cost, but results can
+    take a long time, so it is meant for non-interactive imports.
     """
     yield _ev('info', f"Found {len(image_paths)} image(s) for {aircraft.tail_number}")
 
@@ -86,32 +115,42 @@ def run_import(
     # ------------------------------------------------------------------
     if upload_only:
         yield _ev('info', 'Upload-only mode — skipping transcription')
-        with transaction.atomic():
-            if append_to_document_id:
-                document = Document.objects.get(pk=append_to_document_id)
-                collection = document.collection
-                page_offset = DocumentImage.objects.filter(document=document).count()
-                yield _ev('info', f"Appending to document: {document.name} (offset: {page_offset} pages)")
-            else:
-                collection, created = DocumentCollection.objects.get_or_create(
-                    aircraft=aircraft,
-                    name=collection_name,
-                    defaults={'description': f'Imported {len(image_paths)} images'},
-                )
-                yield _ev('info', f"{'Created' if created else 'Using existing'} collection: {collection.name}")
-
-                document = Document.objects.create(
-                    aircraft=aircraft,
-                    collection=collection,
-                    doc_type=doc_type,
-                    name=doc_name,
-                    description=f'Imported {len(image_paths)} pages.',
-                )
-                yield _ev('info', f"Created document: {document.name}")
-                page_offset = 0
+        if append_to_document_id:
+            document = Document.objects.get(pk=append_to_document_id)
+            collection = document.collection
+            page_offset = DocumentImage.objects.filter(document=document).count()
+            yield _ev('info', f"Appending to document: {document.name} (offset: {page_offset} pages)")
+        else:
+            document = None
+            page_offset = 0
 
-            yield _ev('info', f"Uploading {len(image_paths)} image(s)…")
-            yield from _upload_images(document, image_paths, set(), set(), page_offset=page_offset)
+        yield _ev('info', f"Uploading {len(image_paths)} image(s)…")
+        doc_images: List[DocumentImage] = []
+        try:
+            yield from _store_images(doc_images, image_paths, set(), set(), page_offset=page_offset)
+
+            with transaction.atomic():
+                if document is None:
+                    collection, created = DocumentCollection.objects.get_or_create(
+                        aircraft=aircraft,
+                        name=collection_name,
+                        defaults={'description': f'Imported {len(image_paths)} images'},
+                    )
+                    yield _ev('info', f"{'Created' if created else 'Using existing'} collection: {collection.name}")
+
+                    document = Document.objects.create(
+                        aircraft=aircraft,
+                        collection=collection,
+                        doc_type=doc_type,
+                        name=doc_name,
+                        description=f'Imported {len(image_paths)} pages.',
+                    )
+                    yield _ev('info', f"Created document: {document.name}")
+
+                _save_document_images(document, doc_images)
+        except BaseException:
+            _delete_stored_images(doc_images)
+            raise
 
         yield {
             'type': 'complete',
@@ -133,15 +172,18 @@ def run_import(
             return
 
         try:
-            import anthropic
+            import anthropic  # noqa: F401
         except ImportError:
             yield _ev('error', "The 'anthropic' package is not installed (pip install anthropic)")
             return
 
-        provider_client = anthropic.Anthropic(api_key=api_key)
+        provider_client = _get_anthropic_client(api_key)
     elif provider == 'ollama':
         from django.conf import settings as django_settings
-        provider_client = getattr(django_settings, 'OLLAMA_BASE_URL', 'http://localhost:11434')
+        provider_client = _make_ollama_client(
+            getattr(django_settings, 'OLLAMA_BASE_URL', 'http://localhost:11434'),
+            concurrency or getattr(django_settings, 'LOGBOOK_IMPORT_CONCURRENCY', 1),
+        )
     elif provider == 'litellm':
         from django.conf import settings as django_settings
         base_url = getattr(django_settings, 'LITELLM_BASE_URL', '')
@@ -165,10 +207,34 @@ def run_import(
     non_logbook_pages: Set[int] = set()
     unparseable_pages: Set[int] = set()
 
-    yield from _extract_all_entries(
-        provider, provider_client, image_paths, model, batch_size,
-        all_entries, non_logbook_pages, unparseable_pages,
+    if use_batch_api and provider != 'anthropic':
+        yield _ev('warning', f"Batch API is not supported by provider {provider} — using live requests")
+        use_batch_api = False
+
+    # Identical page images (duplicate uploads) are only sent to the model once
+    extract_paths, page_groups = _dedupe_pages(image_paths)
+    if len(extract_paths) < len(image_paths):
+        yield _ev('info', f"Skipping {len(image_paths) - len(extract_paths)} duplicate page image(s) "
+                          "for extraction")
+
+    if use_batch_api:
+        extraction = _extract_all_entries_batched(
+            provider_client, extract_paths, model, batch_size,
+            all_entries, non_logbook_pages, unparseable_pages,
+        )
+    else:
+        extraction = _extract_all_entries(
+            provider, provider_client, extract_paths, model, batch_size,
+            all_entries, non_logbook_pages, unparseable_pages,
+            concurrency=concurrency,
+        )
+    # Extraction runs on its own thread so a slow reader of these events
+    # (SSE client, per-event job saves) does not hold up model calls.
+    yield from _iter_in_thread(
+        _with_provider_cleanup(extraction, provider, provider_client, extract_paths)
     )
+    if len(extract_paths) < len(image_paths):
+        _restore_page_indices(page_groups, all_entries, non_logbook_pages, unparseable_pages)
 
     if log_type_override:
         for entry in all_entries:
@@ -180,59 +246,76 @@ def run_import(
     if unparseable_pages:
         yield _ev('warning', f"Unparseable pages: {sorted(unparseable_pages)}")
 
-    with transaction.atomic():
-        if append_to_document_id:
-            document = Document.objects.get(pk=append_to_document_id)
-            collection = document.collection
-            page_offset = DocumentImage.objects.filter(document=document).count()
-            yield _ev('info', f"Appending to document: {document.name} (offset: {page_offset} pages)")
-        else:
-            collection, created = DocumentCollection.objects.get_or_create(
-                aircraft=aircraft,
-                name=collection_name,
-                defaults={'description': f'Imported {len(image_paths)} images'},
-            )
-            yield _ev('info', f"{'Created' if created else 'Using existing'} collection: {collection.name}")
-
-            document = Document.objects.create(
-                aircraft=aircraft,
-                collection=collection,
-                doc_type=doc_type,
-                name=doc_name,
-                description=(
-                    f'Imported {len(image_paths)} pages. '
-                    f'Contains {len(all_entries)} logbook entries.'
-                ),
-            )
-            yield _ev('info', f"Created document: {document.name}")
-            page_offset = 0
+    if append_to_document_id:
+        document = Document.objects.get(pk=append_to_document_id)
+        collection = document.collection
+        page_offset = DocumentImage.objects.filter(document=document).count()
+        yield _ev('info', f"Appending to document: {document.name} (offset: {page_offset} pages)")
+    else:
+        document = None
+        page_offset = 0
+
+    # Storage writes (possibly to remote object storage) happen before the
+    # transaction opens so it only spans the row inserts.  Files stored so far
+    # are removed if anything fails, or the import is abandoned, before commit.
+    yield _ev('info', f"Uploading {len(image_paths)} image(s)…")
+    doc_images: List[DocumentImage] = []
+    try:
+        yield from _store_images(doc_images, image_paths, non_logbook_pages, unparseable_pages,
+                                 page_offset=page_offset)
 
-        yield _ev('info', f"Uploading {len(image_paths)} image(s)…")
-        yield from _upload_images(document, image_paths, non_logbook_pages, unparseable_pages,
-                                  page_offset=page_offset)
+        with transaction.atomic():
+            if document is None:
+                collection, created = DocumentCollection.objects.get_or_create(
+                    aircraft=aircraft,
+                    name=collection_name,
+                    defaults={'description': f'Imported {len(image_paths)} images'},
+                )
+                yield _ev('info', f"{'Created' if created else 'Using existing'} collection: {collection.name}")
 
-        yield _ev('info', "Creating logbook entries…")
-        entries_created = 0
-        entries_skipped = 0
-        for entry in all_entries:
-            err = _create_single_entry(aircraft, document, entry, page_offset=page_offset)
-            if err is None:
-                entries_created += 1
-                yield {
-                    'type': 'entry',
-                    'message': (
-                        f"Entry: {entry.get('date')} | "
-                        f"{entry.get('log_type')} | {entry.get('entry_type')}"
+                document = Document.objects.create(
+                    aircraft=aircraft,
+                    collection=collection,
+                    doc_type=doc_type,
+                    name=doc_name,
+                    description=(
+                        f'Imported {len(image_paths)} pages. '
+                        f'Contains {len(all_entries)} logbook entries.'
                     ),
-                    'date': entry.get('date'),
-                    'log_type': entry.get('log_type'),
-                    'entry_type': entry.get('entry_type'),
-                    'signoff': entry.get('signoff_person') or '',
-                    'confidence': entry.get('confidence', 'high'),
-                }
-            else:
-                entries_skipped += 1
-                yield _ev('warning', f"Skipped entry ({entry.get('date')}): {err}")
+                )
+                yield _ev('info', f"Created document: {document.name}")
+
+            _save_document_images(document, doc_images)
+
+            yield _ev('info', "Creating logbook entries…")
+            to_create = []
+            entries_skipped = 0
+            for entry in all_entries:
+                logbook_entry, err = _validate_entry(aircraft, document, entry, page_offset=page_offset)
+                if err is None:
+                    to_create.append(logbook_entry)
+                    yield {
+                        'type': 'entry',
+                        'message': (
+                            f"Entry: {entry.get('date')} | "
+                            f"{entry.get('log_type')} | {entry.get('entry_type')}"
+                        ),
+                        'date': entry.get('date'),
+                        'log_type': entry.get('log_type'),
+                        'entry_type': entry.get('entry_type'),
+                        'signoff': entry.get('signoff_person') or '',
+                        'confidence': entry.get('confidence', 'high'),
+                    }
+                else:
+                    entries_skipped += 1
+                    yield _ev('warning', f"Skipped entry ({entry.get('date')}): {err}")
+
+            LogbookEntry.objects.bulk_create(to_create, batch_size=_BULK_CREATE_BATCH_SIZE)
+            entries_created = len(to_create)
+            yield _ev('info', f"Saved {entries_created} logbook entries")
+    except BaseException:
+        _delete_stored_images(doc_images)
+        raise
 
     yield {
         'type': 'complete',
@@ -257,15 +340,127 @@ _MAX_TOKENS = 16384
 _MAX_RETRIES = 5
 _INITIAL_BACKOFF = 1.0  # seconds
 _MAX_BACKOFF = 60.0  # seconds
+_RETRY_JITTER = 0.25  # fraction of the wait added at random
+
+# Anthropic only caches a prompt prefix of at least this many tokens (the
+# Sonnet/Opus minimum; Haiku needs more).  A shorter prefix marked with
+# cache_control is simply sent uncached, so the marker is left off then
+# (see _system_blocks).
+_PROMPT_CACHE_MIN_TOKENS = 1024
 
 # If output_tokens exceeds this fraction of max_tokens, proactively shrink
 _OUTPUT_PRESSURE_THRESHOLD = 0.80
 
+# Page images are decoded/resized/re-encoded on a shared thread pool (Pillow
+# releases the GIL for this work) so a batch's pages are prepared in parallel
+# and the next batch can be prepared while the current request is in flight.
+_IMAGE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 4,
+                                 thread_name_prefix='logbook-image')
+
+# Model calls from every concurrent import share one pool; each import still
+# keeps at most its own `concurrency` calls in flight.  Idle threads are
+# reused, so an import does not pay thread start-up for each of its batches.
+_REQUEST_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix='logbook-request')
+
+# Prepared pages kept for reuse by overlap pages and re-split batches.  Reuse
+# only ever spans the last few batches, so this need not hold a whole import.
+# The cache is shared by concurrent imports in a process; each import drops its
+# own pages when it finishes (_forget_prepared_images), so nothing outlives it.
+# Bounded by the total size of the base64 text held, not by page count: a
+# resized JPEG page is a few hundred KB, but a large PNG scan can be several MB.
+_IMAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_image_b64_cache: OrderedDict = OrderedDict()
+_image_b64_bytes = 0
+_image_b64_lock = threading.Lock()
+
+# Cached AI responses older than this are ignored and removed
+_RESPONSE_CACHE_TTL = 30 * 24 * 3600  # seconds
+
+# Files API (opt-in via LOGBOOK_IMPORT_ANTHROPIC_FILES_API): beta flag, and the
+# file_id of every page uploaded so far, keyed by (id(client), path, mtime, size),
+# plus a Future for each upload still in progress under the same key
+_FILES_API_BETA = 'files-api-2025-04-14'
+_files_api_ids: dict = {}
+_files_api_pending: dict = {}
+_files_api_lock = threading.Lock()
+
+# Input tokens assumed per page image when rate limiting.  Pages are resized
+# to at most 1568px on the long side, which Anthropic bills at ~1600 tokens.
+_IMAGE_TOKEN_ESTIMATE = 1600
+
+# Extraction events buffered ahead of a slow consumer before the extraction
+# thread waits for it
+_EVENT_QUEUE_SIZE = 64
+
+# ImportJob events are written at most every this many events or seconds
+_JOB_SAVE_EVERY = 20
+_JOB_SAVE_INTERVAL = 2.0  # seconds
+_JOB_SAVE_NOW_EVENTS = frozenset({'batch', 'error', 'complete'})
+
+# Rows per INSERT when saving imported images and entries
+_BULK_CREATE_BATCH_SIZE = 200
+
+# Message Batches API: status poll interval, and page overlap between batches
+# (wider than usual because batches cannot pass carry-forward context).
+_BATCH_API_POLL_INTERVAL = 20.0  # seconds
+_BATCH_API_OVERLAP = 2
+
 
 def _ev(kind: str, message: str) -> dict:
     return {'type': kind, 'message': message}
 
 
+# Bytes read when looking for a JPEG frame header; covers typical EXIF blocks
+_IMAGE_HEADER_PEEK = 64 * 1024
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# JPEG start-of-frame markers (SOF0–SOF15, excluding DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _peek_image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Return (width, height) from a JPEG or PNG header without decoding it.
+
+    Returns None if the file is neither, or if the JPEG frame header is not
+    within the first _IMAGE_HEADER_PEEK bytes; callers then fall back to PIL.
+    """
+    with open(path, 'rb') as fh:
+        head = fh.read(_IMAGE_HEADER_PEEK)
+
+    if head.startswith(_PNG_SIGNATURE):
+        if head[12:16] != b'IHDR':
+            return None
+        return int.from_bytes(head[16:20], 'big'), int.from_bytes(head[20:24], 'big')
+
+    if not head.startswith(b'\xff\xd8'):
+        return None
+
+    i = 2
+    while i + 4 <= len(head):
+        if head[i] != 0xFF:
+            return None
+        marker = head[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # markers without a length
+            i += 2
+            continue
+        if marker == 0xDA:  # start of scan: no frame header before the image data
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > len(head):
+                return None
+            height = int.from_bytes(head[i + 5:i + 7], 'big')
+            width = int.from_bytes(head[i + 7:i + 9], 'big')
+            return width, height
+        i += 2 + int.from_bytes(head[i + 2:i + 4], 'big')
+
+    return None
+
+
 def _get_image_bytes(path: Path, max_px: int = 1568) -> bytes:
     """
     Read an image file and return bytes suitable for base64 encoding.
@@ -279,11 +474,31 @@ def _get_image_bytes(path: Path, max_px: int = 1568) -> bytes:
     Returns original file bytes unchanged if no resize is needed AND the
     format is already JPEG or PNG (avoids re-encoding overhead).
     """
-    from PIL import Image
+    data = _reencode_image(path, max_px)
+    if data is None:
+        with open(path, 'rb') as fh:
+            return fh.read()
+    return data
+
+
+def _reencode_image(path: Path, max_px: int) -> Optional[bytes]:
+    """
+    The resize/re-encode step of _get_image_bytes.
 
+    Returns None when the original file can be sent unchanged, so callers
+    can read it however suits them.
+    """
     suffix = path.suffix.lower()
     is_png = suffix == '.png'
 
+    # Already-small JPEG/PNG pages are sent as-is; read their size from the
+    # header so Pillow is never involved.
+    size = _peek_image_size(path) if suffix in ('.jpg', '.jpeg', '.png') else None
+    if size is not None and max(size) <= max_px:
+        return None
+
+    from PIL import Image
+
     with Image.open(path) as img:
         w, h = img.size
         longest = max(w, h)
@@ -292,13 +507,17 @@ def _get_image_bytes(path: Path, max_px: int = 1568) -> bytes:
         needs_encode = needs_resize or suffix not in ('.jpg', '.jpeg', '.png')
 
         if not needs_encode:
-            with open(path, 'rb') as fh:
-                return fh.read()
+            return None
 
         if needs_resize:
             scale = max_px / longest
             new_w = max(1, int(w * scale))
             new_h = max(1, int(h * scale))
+            if img.format == 'JPEG':
+                # Let libjpeg downscale during decode (DCT-domain shrink by
+                # 1/2, 1/4 or 1/8) so the full-resolution scan is never held
+                # in memory; LANCZOS then finishes from the nearest size above.
+                img.draft('RGB' if img.mode not in ('RGB', 'L') else img.mode, (new_w, new_h))
             img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
 
         buf = io.BytesIO()
@@ -312,6 +531,89 @@ def _get_image_bytes(path: Path, max_px: int = 1568) -> bytes:
         return buf.getvalue()
 
 
+def _get_image_b64(path: Path, max_px: int = 1568) -> str:
+    """
+    Return _get_image_bytes(path) as base64 text, memoised.
+
+    Overlap pages and truncation re-splits send the same page more than once,
+    so the PIL pipeline and encoding are only run once per page.  The cache
+    key includes mtime and size so a replaced file is picked up.
+    """
+    global _image_b64_bytes
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size, max_px)
+    with _image_b64_lock:
+        image_b64 = _image_b64_cache.get(key)
+        if image_b64 is not None:
+            _image_b64_cache.move_to_end(key)
+            return image_b64
+
+    data = _reencode_image(path, max_px)
+    if data is None:
+        image_b64 = _encode_file_b64(path)
+    else:
+        # The base64 alphabet is pure ASCII, so skip the UTF-8 decoder.
+        image_b64 = base64.b64encode(data).decode('ascii')
+
+    if len(image_b64) > _IMAGE_CACHE_MAX_BYTES:
+        return image_b64
+    with _image_b64_lock:
+        previous = _image_b64_cache.pop(key, None)
+        if previous is not None:
+            _image_b64_bytes -= len(previous)
+        _image_b64_cache[key] = image_b64
+        _image_b64_bytes += len(image_b64)
+        while _image_b64_bytes > _IMAGE_CACHE_MAX_BYTES:
+            _, evicted = _image_b64_cache.popitem(last=False)
+            _image_b64_bytes -= len(evicted)
+    return image_b64
+
+
+def _forget_prepared_images(image_paths: List[Path]) -> None:
+    """Drop the pages of image_paths from the _get_image_b64 cache."""
+    global _image_b64_bytes
+    paths = {str(path) for path in image_paths}
+    with _image_b64_lock:
+        for key in [key for key in _image_b64_cache if key[0] in paths]:
+            _image_b64_bytes -= len(_image_b64_cache.pop(key))
+
+
+# Read size for streaming base64; a multiple of 3 so chunks encode without padding
+_B64_CHUNK_SIZE = 3 * 85 * 1024  # 255 KiB
+
+
+def _encode_file_b64(path: Path) -> str:
+    """
+    Base64-encode a file's content, reading it in chunks.
+
+    The raw file is never held in memory whole, so peak usage is the encoded
+    text plus one chunk rather than the file plus its encoding.
+    """
+    out = bytearray()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_B64_CHUNK_SIZE), b''):
+            out += base64.b64encode(chunk)
+    return out.decode('ascii')
+
+
+def _prefetch_batch_images(batch_files: List[Path]) -> List[Future]:
+    """Start preparing a batch's page images on the image pool; one Future per page."""
+    return [_IMAGE_POOL.submit(_get_image_b64, path) for path in batch_files]
+
+
+def _prefetch_file_ids(client, batch_files: List[Path]) -> List[Future]:
+    """Start uploading a batch's pages to the Files API; one file_id Future per page."""
+    return [_IMAGE_POOL.submit(_files_api_id, client, path) for path in batch_files]
+
+
+def _batch_images_b64(
+    batch_files: List[Path], prefetched_images: Optional[List[Future]] = None,
+) -> List[str]:
+    """Return base64 image data for every page in a batch, in page order."""
+    futures = prefetched_images or _prefetch_batch_images(batch_files)
+    return [future.result() for future in futures]
+
+
 def _format_prior_context(entries: list, overlap_page_idx: int) -> str:
     """
     Format recently extracted entries as carry-forward context for the next batch.
@@ -325,13 +627,13 @@ def _format_prior_context(entries: list, overlap_page_idx: int) -> str:
 
     lines = ['Previously extracted entries from the last overlap page:']
     for i, e in enumerate(entries, 1):
-        date = e.get('date') or 'unknown date'
+        entry_date = e.get('date') or 'unknown date'
         log_type = e.get('log_type') or '?'
         entry_type = e.get('entry_type') or '?'
         signoff = e.get('signoff_person') or ''
         text = (e.get('text') or '').strip()
 
-        header = f"  {i}. [{date}] {log_type}/{entry_type}"
+        header = f"  {i}. [{entry_date}] {log_type}/{entry_type}"
         if signoff:
             header += f" — signed by {signoff}"
         lines.append(header)
@@ -346,216 +648,699 @@ def _format_prior_context(entries: list, overlap_page_idx: int) -> str:
 def _extract_all_entries(
     provider, provider_client, image_paths, model, batch_size,
     all_entries, non_logbook_pages, unparseable_pages,
+    concurrency: Optional[int] = None,
 ):
     """Generator: yields progress events while filling all_entries / page sets.
 
     Handles output truncation adaptively: if a batch is truncated, it is split
     into smaller sub-batches and retried.  Also monitors output token pressure
     and proactively shrinks future batch sizes when approaching the limit.
+
+    Up to ``concurrency`` batches (default: settings.LOGBOOK_IMPORT_CONCURRENCY)
+    are in flight at once; results are still consumed in submission order.
+    Carry-forward context is only sent when the preceding batch has already
+    been processed, so concurrency > 1 trades that context for throughput.
+
+    Image preparation is pipelined with the model calls at any concurrency:
+    as each batch is submitted, the pages of the next queued batch start
+    resizing/encoding on the image pool, so they are usually ready by the
+    time that batch is sent.  With the Anthropic Files API enabled they are
+    uploaded instead, and never base64-encoded.
     """
     log = logging.getLogger(__name__)
-    seen_key_index: dict = {}       # key → index in all_entries (for keep-longer dedup)
+    seen_key_index: dict = {}       # key → (index in all_entries, text length) for keep-longer dedup
     prior_context_text: Optional[str] = None   # carry-forward for next batch
 
+    if concurrency is None:
+        from django.conf import settings as django_settings
+        concurrency = getattr(django_settings, 'LOGBOOK_IMPORT_CONCURRENCY', 1)
+    concurrency = max(1, int(concurrency))
+    executor = _REQUEST_POOL if concurrency > 1 else None
+    token_budget = _batch_token_budget()
+    # In Files API mode pages are never base64-encoded, so the lookahead
+    # uploads them instead and hands _call_anthropic the file ids.
+    if provider == 'anthropic' and _files_api_enabled():
+        prefetch = functools.partial(_prefetch_file_ids, provider_client)
+    else:
+        prefetch = _prefetch_batch_images
+
     # Work queue: list of (batch_offset, batch_files, is_split) to process.
     # Starts with the initial batches, but truncated batches get split
     # and re-queued with is_split=True.
-    work_queue = [(off, files, False) for off, files in _make_batches(image_paths, batch_size)]
+    #
+    # Each item covers the consecutive pages batch_offset .. batch_offset +
+    # len(batch_files) - 1, and that is the only thing the queue guarantees.
+    # With batches in flight, items are not in page order and leave gaps for
+    # the pages other batches hold, so a page's number always comes from its
+    # own item's offset, never from a neighbouring item (see _rebatch_work).
+    work_queue = deque((off, files, False)
+                       for off, files in _make_batches(image_paths, batch_size, token_budget=token_budget))
+    # Submitted batches awaiting results: (batch_num, offset, files, is_split, future)
+    in_flight: deque = deque()
+    # Image prep for the batch at the head of work_queue: (queue item, futures)
+    lookahead = None
     batch_num = 0
     total_estimate = len(work_queue)
 
-    while work_queue:
-        batch_offset, batch_files, is_split_batch = work_queue.pop(0)
-        batch_num += 1
+    try:
+        while work_queue or in_flight:
+            while work_queue and len(in_flight) < concurrency:
+                item = work_queue.popleft()
+                batch_offset, batch_files, is_split_batch = item
+                batch_num += 1
+                prefetched = lookahead[1] if lookahead and lookahead[0] is item else None
+
+                yield {
+                    'type': 'batch',
+                    'message': (
+                        f"Batch {batch_num}/{total_estimate}: pages {batch_offset}–"
+                        f"{batch_offset + len(batch_files) - 1} ({len(batch_files)} images)"
+                    ),
+                    'batch': batch_num,
+                    'total_batches': total_estimate,
+                }
+
+                # Prepare the next batch's images while this one is in flight
+                if work_queue:
+                    lookahead = (work_queue[0], prefetch(work_queue[0][1]))
+
+                ctx = prior_context_text if not (is_split_batch or in_flight) else None
+                future = _submit(executor, _call_model_cached, provider, provider_client,
+                                 batch_files, model, prior_context_text=ctx,
+                                 prefetched_images=prefetched)
+                in_flight.append((batch_num, batch_offset, batch_files, is_split_batch, future))
+
+            this_batch, batch_offset, batch_files, is_split_batch, future = in_flight.popleft()
+            try:
+                result = future.result()
+            except Exception:
+                log.exception("AI API error in batch %d (provider: %s)", this_batch, provider)
+                yield _ev('error', f"AI API error in batch {this_batch}. See server logs for details.")
+                for j in range(len(batch_files)):
+                    unparseable_pages.add(batch_offset + j)
+                continue
+
+            # -- Handle truncation by splitting the batch -----------------
+            if result['truncated']:
+                if len(batch_files) <= 1:
+                    yield _ev('warning',
+                              f"Single-page batch {this_batch} truncated — marking page as unparseable")
+                    unparseable_pages.add(batch_offset)
+                    continue
+
+                half = max(1, len(batch_files) // 2)
+                sub_b_start = half - 1
+                sub_a = (batch_offset, batch_files[:half], True)
+                sub_b = (batch_offset + sub_b_start, batch_files[sub_b_start:], True)
+
+                yield _ev('warning',
+                          f"Batch {this_batch} truncated ({len(batch_files)} images) — "
+                          f"splitting into sub-batches of {len(sub_a[1])} and {len(sub_b[1])}")
+
+                # Insert sub-batches at front of work queue
+                work_queue.appendleft(sub_b)
+                work_queue.appendleft(sub_a)
+                total_estimate += 1  # one batch became two
+                continue
+
+            # -- Proactive batch-size shrink for remaining work -----------
+            output_tokens = result['output_tokens']
+            if (output_tokens > _OUTPUT_PRESSURE_THRESHOLD * _MAX_TOKENS
+                    and len(batch_files) > 1
+                    and work_queue):
+                new_size = max(1, len(batch_files) // 2)
+                yield _ev('info',
+                          f"  Output tokens {output_tokens}/{_MAX_TOKENS} "
+                          f"(>{_OUTPUT_PRESSURE_THRESHOLD:.0%}) — "
+                          f"shrinking remaining batches to {new_size} images")
+                work_queue = deque(_rebatch_work(work_queue, new_size))
+                total_estimate = batch_num + len(work_queue)
+
+            # -- Collect results ------------------------------------------
+            data = result['data']
+            cache_note = ''
+            if result.get('from_cache'):
+                cache_note = " (cached result, no API call)"
+            elif result.get('cache_read_tokens'):
+                cache_note = f" ({result['cache_read_tokens']} prompt tokens from cache)"
+            yield _ev('info', f"  → {len(data.get('entries') or [])} entries extracted "
+                              f"from batch {this_batch}{cache_note}")
+
+            batch_entries_added = _collect_batch_entries(
+                data, batch_offset, all_entries, seen_key_index,
+                non_logbook_pages, unparseable_pages,
+            )
+
+            # Update carry-forward context for the next non-split batch
+            if not is_split_batch and batch_entries_added:
+                overlap_page_idx = batch_offset + len(batch_files) - 1
+                n_ctx = min(3, len(batch_entries_added))
+                prior_context_text = _format_prior_context(
+                    batch_entries_added[-n_ctx:], overlap_page_idx
+                )
+    finally:
+        # Don't leave queued calls for an abandoned import on the shared pool,
+        # and let calls already running finish before the caller releases the
+        # provider session or uploaded files they use.
+        pending = [future for *_, future in in_flight]
+        if lookahead:
+            pending += lookahead[1]
+        for future in pending:
+            future.cancel()
+        wait_futures(pending)
+
+
+def _rebatch_work(work_queue, batch_size: int) -> list:
+    """
+    Regroup queued work into batches of at most batch_size pages.
+
+    Pages are taken by their own offsets, sorted, and a page queued twice
+    (an overlap page) is kept once.  A new batch starts at every gap, so each
+    returned (offset, files, False) item still covers consecutive pages.
+    """
+    pages: dict = {}
+    for off, files, _ in work_queue:
+        for i, f in enumerate(files, off):
+            pages.setdefault(i, f)
+
+    batches = []
+    run_start = None
+    run_files: list = []
+    for idx in sorted(pages):
+        if run_files and (idx != run_start + len(run_files) or len(run_files) >= batch_size):
+            batches.append((run_start, run_files, False))
+            run_files = []
+        if not run_files:
+            run_start = idx
+        run_files.append(pages[idx])
+    if run_files:
+        batches.append((run_start, run_files, False))
+    return batches
+
+
+def _with_provider_cleanup(
+    extraction: Iterator[dict], provider: str, provider_client, image_paths: List[Path],
+) -> Iterator[dict]:
+    """
+    Generator: pass extraction's events through, then release the provider client.
+
+    Closes the Ollama session, or deletes the import's Files API uploads, and
+    drops its prepared page images from the _get_image_b64 cache.  Wrapped by
+    _iter_in_thread, this cleanup runs on the producer thread after its last
+    model call has returned, never under a call still in flight.
+    """
+    try:
+        yield from extraction
+    finally:
+        _forget_prepared_images(image_paths)
+        if provider == 'ollama':
+            provider_client[1].close()
+        elif provider == 'anthropic':
+            _delete_uploaded_files(provider_client, image_paths)
+
+
+def _iter_in_thread(events: Iterator[dict]) -> Iterator[dict]:
+    """
+    Drive an event generator on a background thread and yield its events here.
+
+    Events pass through a queue of _EVENT_QUEUE_SIZE, so the producer only
+    waits when that many are unread.  An exception raised by the producer is
+    re-raised in the caller; closing this generator early stops the producer
+    at its next event, and it then closes `events` on its own thread.  Cleanup
+    that must not race the producer therefore belongs in the finally of
+    `events` itself (see _with_provider_cleanup), not after this returns.
+    """
+    events_queue: queue.Queue = queue.Queue(maxsize=_EVENT_QUEUE_SIZE)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                events_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce():
+        try:
+            for event in events:
+                if not _put((event, None)):
+                    return
+        except BaseException as exc:
+            _put((done, exc))
+        else:
+            _put((done, None))
+        finally:
+            events.close()
+
+    threading.Thread(target=_produce, name='logbook-extract', daemon=True).start()
+    try:
+        while True:
+            event, exc = events_queue.get()
+            if event is done:
+                if exc is not None:
+                    raise exc
+                return
+            yield event
+    finally:
+        stop.set()
+
+
+def _submit(executor, fn, *args, **kwargs) -> Future:
+    """Run fn on executor, or inline as an already-resolved Future if executor is None."""
+    if executor is not None:
+        return executor.submit(fn, *args, **kwargs)
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def _collect_batch_entries(
+    data, batch_offset, all_entries, seen_key_index, non_logbook_pages, unparseable_pages,
+) -> list:
+    """
+    Merge one batch's parsed response into the running results.
+
+    Rebases page indices by batch_offset and de-duplicates against entries
+    already seen (overlap pages are sent twice), keeping the longer text.
+    Returns the entries newly appended to all_entries.
+    """
+    batch_entries_added = []
+
+    for entry in data.get('entries') or []:
+        # Missing or null page indices fall back to the batch's first page
+        ps = entry.get('page_start')
+        if ps is None:
+            ps = 0
+        pe = entry.get('page_end')
+        if pe is None:
+            pe = ps
+        entry['page_start'] = batch_offset + ps
+        entry['page_end'] = batch_offset + pe
+
+        # Keyed on a text prefix, not the full text: the copy of an entry read
+        # from an overlap page is often cut off or continued, so full texts
+        # differ and the longer one must replace the shorter.
+        raw_text = entry.get('text') or ''
+        key = (entry.get('date'), raw_text[:80].strip())
+        new_text_len = len(raw_text.strip())
+
+        seen = seen_key_index.get(key)
+        if seen is not None:
+            existing_idx, existing_text_len = seen
+            if new_text_len > existing_text_len:
+                all_entries[existing_idx] = entry
+                seen_key_index[key] = (existing_idx, new_text_len)
+            continue
+
+        seen_key_index[key] = (len(all_entries), new_text_len)
+        all_entries.append(entry)
+        batch_entries_added.append(entry)
+
+    non_logbook_pages.update(batch_offset + i for i in data.get('non_logbook_pages') or ())
+    unparseable_pages.update(batch_offset + i for i in data.get('unparseable_pages') or ())
+
+    return batch_entries_added
+
+
+def _extract_all_entries_batched(
+    client, image_paths, model, batch_size,
+    all_entries, non_logbook_pages, unparseable_pages,
+):
+    """Generator: like _extract_all_entries, but via the Anthropic Message Batches API.
+
+    Every page batch is submitted as one asynchronous batch job, which is
+    billed at half price and not subject to the per-minute rate limits, but
+    can take minutes to hours to finish.  Batches are independent, so there
+    is no carry-forward context; the page overlap is widened to 2 instead.
+    Truncated or failed batches are not retried — their pages are marked
+    unparseable.
+    """
+    log = logging.getLogger(__name__)
+    seen_key_index: dict = {}
+
+    batches = _make_batches(image_paths, batch_size, overlap=_BATCH_API_OVERLAP,
+                            token_budget=_batch_token_budget())
+    batch_requests = [
+        {'custom_id': f"b{i}", 'params': _build_anthropic_request(files, model)}
+        for i, (_, files) in enumerate(batches)
+    ]
 
+    yield _ev('info', f"Submitting {len(batch_requests)} batch(es) to the Message Batches API")
+    message_batch = client.messages.batches.create(requests=batch_requests)
+
+    while True:
+        counts = message_batch.request_counts
+        done = counts.succeeded + counts.errored + counts.canceled + counts.expired
+        yield {
+            'type': 'batch_status',
+            'message': (
+                f"Batch job {message_batch.id} {message_batch.processing_status}: "
+                f"{done} of {len(batch_requests)} done"
+            ),
+            'batch_id': message_batch.id,
+            'status': message_batch.processing_status,
+            'done': done,
+            'total_batches': len(batch_requests),
+        }
+        if message_batch.processing_status == 'ended':
+            break
+        time.sleep(_BATCH_API_POLL_INTERVAL)
+        message_batch = client.messages.batches.retrieve(message_batch.id)
+
+    results = {item.custom_id: item.result for item in client.messages.batches.results(message_batch.id)}
+
+    for i, (batch_offset, batch_files) in enumerate(batches):
+        batch_num = i + 1
         yield {
             'type': 'batch',
             'message': (
-                f"Batch {batch_num}/{total_estimate}: pages {batch_offset}–"
+                f"Batch {batch_num}/{len(batches)}: pages {batch_offset}–"
                 f"{batch_offset + len(batch_files) - 1} ({len(batch_files)} images)"
             ),
             'batch': batch_num,
-            'total_batches': total_estimate,
+            'total_batches': len(batches),
         }
 
-        try:
-            ctx = prior_context_text if not is_split_batch else None
-            result = _call_model(provider, provider_client, batch_files, model,
-                                 prior_context_text=ctx)
-        except Exception:
-            log.exception("AI API error in batch %d (provider: %s)", batch_num, provider)
-            yield _ev('error', f"AI API error in batch {batch_num}. See server logs for details.")
+        item = results.get(f"b{i}")
+        result = None
+        if item is not None and item.type == 'succeeded':
+            try:
+                result = _parse_anthropic_response(item.message)
+            except ValueError:
+                log.exception("Invalid JSON in batch %d", batch_num)
+        else:
+            log.error("Batch %d did not succeed: %s", batch_num, getattr(item, 'type', 'missing'))
+
+        if result is None or result['truncated']:
+            reason = 'truncated' if result else 'failed'
+            yield _ev('error', f"Batch {batch_num} {reason} — marking its pages as unparseable")
             for j in range(len(batch_files)):
                 unparseable_pages.add(batch_offset + j)
             continue
 
-        # -- Handle truncation by splitting the batch -----------------
-        if result['truncated']:
-            if len(batch_files) <= 1:
-                yield _ev('warning',
-                          f"Single-page batch {batch_num} truncated — marking page as unparseable")
-                unparseable_pages.add(batch_offset)
-                continue
+        data = result['data']
+        yield _ev('info', f"  → {len(data.get('entries') or [])} entries extracted "
+                          f"from batch {batch_num}")
+        _collect_batch_entries(
+            data, batch_offset, all_entries, seen_key_index,
+            non_logbook_pages, unparseable_pages,
+        )
 
-            half = max(1, len(batch_files) // 2)
-            sub_b_start = half - 1
-            sub_a = (batch_offset, batch_files[:half], True)
-            sub_b = (batch_offset + sub_b_start, batch_files[sub_b_start:], True)
 
-            yield _ev('warning',
-                      f"Batch {batch_num} truncated ({len(batch_files)} images) — "
-                      f"splitting into sub-batches of {len(sub_a[1])} and {len(sub_b[1])}")
+def _dedupe_pages(image_paths: List[Path]) -> Tuple[List[Path], List[List[int]]]:
+    """
+    Collapse byte-identical page images.
 
-            # Insert sub-batches at front of work queue
-            work_queue.insert(0, sub_b)
-            work_queue.insert(0, sub_a)
-            total_estimate += 1  # one batch became two
-            continue
+    Returns (unique_paths, groups): unique_paths in first-seen order, and for
+    each of them the indices in image_paths with the same content (first
+    occurrence first).  If any file cannot be read every page is kept.
+    """
+    try:
+        digests = list(_IMAGE_POOL.map(_file_digest, image_paths))
+    except OSError:
+        return list(image_paths), [[i] for i in range(len(image_paths))]
+
+    group_of: dict = {}
+    unique_paths: List[Path] = []
+    groups: List[List[int]] = []
+    for idx, (path, digest) in enumerate(zip(image_paths, digests)):
+        j = group_of.get(digest)
+        if j is None:
+            group_of[digest] = len(groups)
+            unique_paths.append(path)
+            groups.append([idx])
+        else:
+            groups[j].append(idx)
+    return unique_paths, groups
 
-        # -- Proactive batch-size shrink for remaining work -----------
-        output_tokens = result['output_tokens']
-        if (output_tokens > _OUTPUT_PRESSURE_THRESHOLD * _MAX_TOKENS
-                and len(batch_files) > 1
-                and work_queue):
-            new_size = max(1, len(batch_files) // 2)
-            yield _ev('info',
-                      f"  Output tokens {output_tokens}/{_MAX_TOKENS} "
-                      f"(>{_OUTPUT_PRESSURE_THRESHOLD:.0%}) — "
-                      f"shrinking remaining batches to {new_size} images")
-            # Re-batch the remaining images from the work queue
-            remaining_offsets_files = []
-            for off, files, _ in work_queue:
-                for i, f in enumerate(files):
-                    remaining_offsets_files.append((off + i, f))
-            # Deduplicate by offset (overlap pages may appear twice)
-            seen_offsets: set = set()
-            deduped: List[tuple] = []
-            for off, f in remaining_offsets_files:
-                if off not in seen_offsets:
-                    seen_offsets.add(off)
-                    deduped.append((off, f))
-            deduped.sort(key=lambda x: x[0])
-            # Re-batch with the new smaller size
-            new_queue = []
-            for i in range(0, len(deduped), new_size):
-                chunk = deduped[i:i + new_size]
-                chunk_offset = chunk[0][0]
-                chunk_files = [f for _, f in chunk]
-                new_queue.append((chunk_offset, chunk_files, False))
-            work_queue = new_queue
-            total_estimate = batch_num + len(work_queue)
-
-        # -- Collect results ------------------------------------------
-        data = result['data']
-        entries = data.get('entries') or []
-        yield _ev('info', f"  → {len(entries)} entries extracted from batch {batch_num}")
 
-        batch_entries_added = []
+def _restore_page_indices(groups, all_entries, non_logbook_pages, unparseable_pages):
+    """
+    Map page indices from the de-duplicated page list back onto the originals.
 
-        for entry in entries:
-            ps = entry.get('page_start', 0)
-            pe = entry.get('page_end', ps)
-            entry['page_start'] = batch_offset + ps
-            entry['page_end'] = batch_offset + pe
-
-            key = (entry.get('date'), (entry.get('text') or '')[:80].strip())
-            new_text_len = len((entry.get('text') or '').strip())
-
-            if key in seen_key_index:
-                existing_idx = seen_key_index[key]
-                existing_text_len = len((all_entries[existing_idx].get('text') or '').strip())
-                if new_text_len > existing_text_len:
-                    all_entries[existing_idx] = entry
-                continue
+    Entries point at the first occurrence of their pages; non-logbook and
+    unparseable marks apply to every copy of a page.
+    """
+    for entry in all_entries:
+        for key in ('page_start', 'page_end'):
+            idx = entry.get(key)
+            if isinstance(idx, int) and 0 <= idx < len(groups):
+                entry[key] = groups[idx][0]
+
+    for pages in (non_logbook_pages, unparseable_pages):
+        marked = [j for j in pages if 0 <= j < len(groups)]
+        pages.clear()
+        pages.update(idx for j in marked for idx in groups[j])
 
-            seen_key_index[key] = len(all_entries)
-            all_entries.append(entry)
-            batch_entries_added.append(entry)
-
-        for local_idx in data.get('non_logbook_pages') or []:
-            non_logbook_pages.add(batch_offset + local_idx)
-        for local_idx in data.get('unparseable_pages') or []:
-            unparseable_pages.add(batch_offset + local_idx)
-
-        # Update carry-forward context for the next non-split batch
-        if not is_split_batch and batch_entries_added:
-            overlap_page_idx = batch_offset + len(batch_files) - 1
-            n_ctx = min(3, len(batch_entries_added))
-            prior_context_text = _format_prior_context(
-                batch_entries_added[-n_ctx:], overlap_page_idx
-            )
 
+def _make_batches(image_paths: List[Path], batch_size: int, overlap: int = 1, token_budget: int = 0):
+    """Return list of (offset, files) with an `overlap`-image overlap between batches.
 
-def _make_batches(image_paths: List[Path], batch_size: int):
-    """Return list of (offset, files) with 1-image overlap between batches."""
+    With a token_budget, a batch also ends early once its estimated image
+    input tokens would exceed the budget (but always holds at least one
+    page more than the overlap, so batching still advances).
+    """
     batches = []
     i = 0
     n = len(image_paths)
+    tokens = [_estimate_image_tokens(p) for p in image_paths] if token_budget else None
     while i < n:
         end = min(i + batch_size, n)
+        if tokens:
+            used = 0
+            for j in range(i, end):
+                used += tokens[j]
+                if used > token_budget and j > i + overlap:
+                    end = j
+                    break
         batches.append((i, image_paths[i:end]))
         if end >= n:
             break
-        # Overlap by 1 page to catch cross-page entries, but only when
-        # batch_size > 1 (otherwise i would never advance).
-        i = end - 1 if batch_size > 1 else end
+        # Overlap to catch cross-page entries, but always advance by at least
+        # one page (otherwise a batch_size <= overlap would never terminate).
+        i = end - max(0, min(overlap, end - i - 1))
     return batches
 
 
+def _batch_token_budget() -> int:
+    """Per-batch image token budget from settings (0 = batch by page count only)."""
+    from django.conf import settings as django_settings
+    return int(getattr(django_settings, 'LOGBOOK_IMPORT_BATCH_TOKEN_BUDGET', 0) or 0)
+
+
+def _estimate_image_tokens(path: Path, max_px: int = 1568) -> int:
+    """
+    Estimate the input tokens one page image costs (width * height / 750
+    after the resize to max_px).  Uses the header only; pages whose size
+    can't be read that way count as _IMAGE_TOKEN_ESTIMATE.
+    """
+    size = _peek_image_size(path)
+    if not size or not all(size):
+        return _IMAGE_TOKEN_ESTIMATE
+    width, height = size
+    longest = max(width, height)
+    if longest > max_px:
+        scale = max_px / longest
+        width, height = width * scale, height * scale
+    return min(_IMAGE_TOKEN_ESTIMATE, int(width * height / 750) + 1)
+
+
 def _call_model(
     provider: str,
     provider_client,
     batch_files: List[Path],
     model: str,
     prior_context_text: Optional[str] = None,
+    prefetched_images: Optional[List[Future]] = None,
 ) -> dict:
     """
     Dispatch to the correct provider function.
-    Returns dict with keys: 'data', 'truncated', 'output_tokens'.
+    Returns dict with keys: 'data', 'truncated', 'output_tokens', and for
+    Ollama and LiteLLM 'degraded' (invalid response replaced with an empty one).
     """
     if provider == 'anthropic':
         return _call_anthropic(provider_client, batch_files, model,
-                               prior_context_text=prior_context_text)
+                               prior_context_text=prior_context_text,
+                               prefetched_images=prefetched_images)
     elif provider == 'ollama':
         return _call_ollama(provider_client, batch_files, model,
-                            prior_context_text=prior_context_text)
+                            prior_context_text=prior_context_text,
+                            prefetched_images=prefetched_images)
     elif provider == 'litellm':
         return _call_litellm(provider_client, batch_files, model,
-                             prior_context_text=prior_context_text)
+                             prior_context_text=prior_context_text,
+                             prefetched_images=prefetched_images)
     else:
         raise ValueError(f"Unknown provider: {provider}")
 
 
-def _call_anthropic(
-    client,
+def _call_model_cached(
+    provider: str,
+    provider_client,
     batch_files: List[Path],
     model: str,
     prior_context_text: Optional[str] = None,
+    prefetched_images: Optional[List[Future]] = None,
 ) -> dict:
     """
-    Send a batch of images to the Anthropic API; return dict with keys:
-      'data'          — parsed JSON response
-      'truncated'     — True if stop_reason was max_tokens
-      'output_tokens' — number of output tokens used
-    Raises anthropic.APIStatusError / anthropic.RateLimitError on
-    unrecoverable API errors (rate-limit retries are handled here).
+    _call_model with a persistent on-disk cache of results.
+
+    Results are stored as JSON under settings.LOGBOOK_IMPORT_CACHE_DIR, keyed
+    by provider, model, prompt/schema, carry-forward context and the content
+    of every page (in order), so re-importing the same pages skips the API.
+    A result served from disk carries 'from_cache': True and no prompt-cache
+    usage.  Any cache I/O problem just falls through to a live call.
     """
-    import anthropic
+    cache_file = _response_cache_file(provider, model, batch_files, prior_context_text)
+    if cache_file is not None:
+        try:
+            if time.time() - cache_file.stat().st_mtime < _RESPONSE_CACHE_TTL:
+                cached = json.loads(cache_file.read_text(encoding='utf-8'))
+                cached['from_cache'] = True
+                return cached
+            cache_file.unlink()
+        except (OSError, ValueError):
+            pass
+
+    result = _call_model(provider, provider_client, batch_files, model,
+                         prior_context_text=prior_context_text,
+                         prefetched_images=prefetched_images)
+
+    # A response that had to be replaced with an empty result is not worth
+    # keeping: a later import of the same pages should ask the model again.
+    if cache_file is not None and not result.get('degraded'):
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{threading.get_ident()}.tmp')
+            # Prompt-cache usage belongs to this API call, not to later hits
+            stored = {k: v for k, v in result.items() if k != 'cache_read_tokens'}
+            tmp_file.write_text(json.dumps(stored), encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            logging.getLogger(__name__).warning(
+                "Could not write logbook import cache file %s", cache_file, exc_info=True,
+            )
+    return result
+
+
+def _response_cache_file(
+    provider: str, model: str, batch_files: List[Path], prior_context_text: Optional[str],
+) -> Optional[Path]:
+    """Return the cache file path for a model call, or None if caching is off."""
+    from django.conf import settings as django_settings
+    cache_dir = getattr(django_settings, 'LOGBOOK_IMPORT_CACHE_DIR', '')
+    if not cache_dir:
+        return None
+
+    h = hashlib.sha256(_PROMPT_FINGERPRINT)
+    for part in (provider, model, prior_context_text or ''):
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    try:
+        for path in batch_files:
+            h.update(_file_digest(path))
+    except OSError:
+        return None
+    key = h.hexdigest()
+    return Path(cache_dir) / key[:2] / f'{key}.json'
+
+
+# Names _response_cache_file and _call_model_cached write under the cache
+# directory: a two-hex-digit shard, holding <key>.json and <key>.<thread>.tmp
+_CACHE_SHARD_RE = re.compile(r'[0-9a-f]{2}')
+_CACHE_FILE_RE = re.compile(r'([0-9a-f]{64})(?:\.json|\.\d+\.tmp)')
+
+
+def prune_response_cache(max_age: float = _RESPONSE_CACHE_TTL) -> int:
+    """
+    Delete cache files under settings.LOGBOOK_IMPORT_CACHE_DIR older than max_age seconds.
+
+    Only files named as the cache names them, inside its own shard
+    directories, are considered, so a cache directory pointed at a shared
+    location never loses anything else.  Run by the prune_logbook_cache
+    management command, not by imports, so no import pays for walking the
+    cache.  Returns the number of files removed; files that cannot be read
+    or removed are skipped.
+    """
+    from django.conf import settings as django_settings
+    cache_dir = getattr(django_settings, 'LOGBOOK_IMPORT_CACHE_DIR', '')
+    if not cache_dir:
+        return 0
+
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        shards = [entry for entry in os.scandir(cache_dir)
+                  if _CACHE_SHARD_RE.fullmatch(entry.name) and entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return 0
+    for shard in shards:
+        try:
+            entries = list(os.scandir(shard.path))
+        except OSError:
+            continue
+        for entry in entries:
+            match = _CACHE_FILE_RE.fullmatch(entry.name)
+            if match is None or not match.group(1).startswith(shard.name):
+                continue
+            try:
+                if (entry.is_file(follow_symlinks=False)
+                        and entry.stat(follow_symlinks=False).st_mtime < cutoff):
+                    os.unlink(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+    return removed
+
 
+def _file_digest(path: Path) -> bytes:
+    """BLAKE2b-256 of a file's content, memoised on (path, mtime, size)."""
+    stat = path.stat()
+    return _file_digest_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest_cached(path: Path, mtime_ns: int, size: int) -> bytes:
+    # BLAKE2b outruns SHA-256 on CPUs without SHA extensions, and file_digest
+    # hashes into a reused buffer without a Python-level read loop.
+    with open(path, 'rb') as fh:
+        return hashlib.file_digest(fh, lambda: hashlib.blake2b(digest_size=32)).digest()
+
+
+def _build_anthropic_request(
+    batch_files: List[Path],
+    model: str,
+    prior_context_text: Optional[str] = None,
+    prefetched_images: Optional[List[Future]] = None,
+    file_ids: Optional[List[str]] = None,
+) -> dict:
+    """
+    Build the messages.create kwargs for one batch of page images.
+
+    Images are inlined as base64 unless file_ids (Files API references, one
+    per page) are given.
+    """
     content = []
 
     if prior_context_text:
         content.append({'type': 'text', 'text': prior_context_text})
 
-    for local_idx, image_path in enumerate(batch_files):
+    if file_ids is not None:
+        sources = [{'type': 'file', 'file_id': file_id} for file_id in file_ids]
+    else:
+        sources = [
+            {'type': 'base64', 'media_type': _image_media_type(image_path), 'data': image_b64}
+            for image_path, image_b64 in zip(batch_files, _batch_images_b64(batch_files, prefetched_images))
+        ]
+    for local_idx, (image_path, source) in enumerate(zip(batch_files, sources)):
         content.append({'type': 'text', 'text': f"Page {local_idx} ({image_path.name}):"})
-        image_bytes = _get_image_bytes(image_path)
-        image_b64 = base64.standard_b64encode(image_bytes).decode('utf-8')
-        media_type = 'image/png' if image_path.suffix.lower() == '.png' else 'image/jpeg'
-        content.append({
-            'type': 'image',
-            'source': {'type': 'base64', 'media_type': media_type, 'data': image_b64},
-        })
+        content.append({'type': 'image', 'source': source})
 
     content.append({
         'type': 'text',
@@ -566,11 +1351,10 @@ def _call_anthropic(
         ),
     })
 
-    log = logging.getLogger(__name__)
-    request_kwargs = dict(
+    return dict(
         model=model,
         max_tokens=_MAX_TOKENS,
-        system=EXTRACT_SYSTEM_PROMPT,
+        system=_system_blocks(EXTRACT_SYSTEM_PROMPT, EXTRACT_OUTPUT_SCHEMA),
         messages=[{'role': 'user', 'content': content}],
         output_config={
             'format': {
@@ -580,22 +1364,99 @@ def _call_anthropic(
         },
     )
 
+
+def _system_blocks(system_prompt: str, output_schema: dict) -> List[dict]:
+    """
+    Return the system prompt, followed by the output schema as text, as request blocks.
+
+    Both are identical for every batch.  The prompt alone is too short for
+    Anthropic to cache, but together with the schema the system prefix
+    reaches _PROMPT_CACHE_MIN_TOKENS, so the last block is marked as a
+    cacheable prefix and batches after the first are billed at the
+    cache-read rate.  The length check (~4 chars per token, as in
+    _estimate_input_tokens) leaves the marker off if the prefix ever falls
+    short of the minimum.
+    """
+    blocks = [
+        {'type': 'text', 'text': system_prompt},
+        {'type': 'text', 'text': f"The JSON response must match this schema:\n{json.dumps(output_schema)}"},
+    ]
+    if sum(len(block['text']) for block in blocks) // 4 >= _PROMPT_CACHE_MIN_TOKENS:
+        blocks[-1]['cache_control'] = {'type': 'ephemeral'}
+    return blocks
+
+
+def _parse_anthropic_response(response) -> dict:
+    """Convert an Anthropic Message into the provider-neutral result dict."""
+    truncated = response.stop_reason == 'max_tokens'
+    output_tokens = getattr(response.usage, 'output_tokens', 0)
+    cache_read_tokens = getattr(response.usage, 'cache_read_input_tokens', None) or 0
+
+    data = {}
+    if not truncated:
+        data = json.loads(response.content[0].text)
+
+    return {
+        'data': data,
+        'truncated': truncated,
+        'output_tokens': output_tokens,
+        'cache_read_tokens': cache_read_tokens,
+    }
+
+
+def _call_anthropic(
+    client,
+    batch_files: List[Path],
+    model: str,
+    prior_context_text: Optional[str] = None,
+    prefetched_images: Optional[List[Future]] = None,
+) -> dict:
+    """
+    Send a batch of images to the Anthropic API; return dict with keys:
+      'data'          — parsed JSON response
+      'truncated'     — True if stop_reason was max_tokens
+      'output_tokens' — number of output tokens used
+      'cache_read_tokens' — input tokens served from the prompt cache
+    Raises anthropic.APIStatusError / anthropic.RateLimitError on
+    unrecoverable API errors (rate-limit retries are handled here).
+    """
+    import anthropic
+
+    log = logging.getLogger(__name__)
+    create = client.messages.create
+    file_ids = None
+    if _files_api_enabled():
+        if prefetched_images:
+            # Prefetched by _extract_all_entries as file ids, not base64
+            file_ids = [future.result() for future in prefetched_images]
+            prefetched_images = None
+        else:
+            file_ids = [_files_api_id(client, path) for path in batch_files]
+        create = functools.partial(client.beta.messages.create, betas=[_FILES_API_BETA])
+    request_kwargs = _build_anthropic_request(batch_files, model, prior_context_text,
+                                              prefetched_images, file_ids=file_ids)
+
+    limiter = _anthropic_rate_limiter()
+    est_tokens = _estimate_input_tokens(request_kwargs) if limiter else 0
+
     backoff = _INITIAL_BACKOFF
     for attempt in range(1, _MAX_RETRIES + 1):
+        if limiter:
+            limiter.acquire(est_tokens)
         try:
-            response = client.messages.create(**request_kwargs)
+            response = create(**request_kwargs)
             break
         except anthropic.RateLimitError as exc:
             if attempt == _MAX_RETRIES:
                 raise
-            wait = _retry_after(exc, backoff)
+            wait = _jittered(_retry_after(exc, backoff))
             log.warning("Rate limited (attempt %d/%d), waiting %.1fs",
                         attempt, _MAX_RETRIES, wait)
             time.sleep(wait)
             backoff = min(backoff * 2, _MAX_BACKOFF)
         except anthropic.APIStatusError as exc:
             if exc.status_code == 529 and attempt < _MAX_RETRIES:
-                wait = _retry_after(exc, backoff)
+                wait = _jittered(_retry_after(exc, backoff))
                 log.warning("API overloaded (attempt %d/%d), waiting %.1fs",
                             attempt, _MAX_RETRIES, wait)
                 time.sleep(wait)
@@ -603,41 +1464,218 @@ def _call_anthropic(
             else:
                 raise
 
-    truncated = response.stop_reason == 'max_tokens'
-    output_tokens = getattr(response.usage, 'output_tokens', 0)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Batch of %d page(s) used %s input tokens (estimated %d)",
+                  len(batch_files), getattr(response.usage, 'input_tokens', '?'),
+                  est_tokens or _estimate_input_tokens(request_kwargs))
+    return _parse_anthropic_response(response)
 
-    data = {}
-    if not truncated:
-        data = json.loads(response.content[0].text)
 
-    return {
-        'data': data,
-        'truncated': truncated,
-        'output_tokens': output_tokens,
-    }
+class _RateLimiter:
+    """
+    Token buckets for requests per minute and input tokens per minute.
+
+    Shared by every thread in the process, so concurrent batches (and
+    concurrent imports) throttle themselves instead of running into 429
+    responses.  A limit of 0 disables that bucket.  Both buckets start full.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of about ``tokens`` input tokens may be sent."""
+        if self.tpm:
+            # A request larger than the whole bucket could otherwise never go
+            tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._updated = now
+                self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+                self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if not wait:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_rate_limiter(rpm: int, tpm: int) -> _RateLimiter:
+    return _RateLimiter(rpm, tpm)
+
+
+def _anthropic_rate_limiter() -> Optional[_RateLimiter]:
+    """Return the process-wide Anthropic limiter, or None if no limits are configured."""
+    from django.conf import settings as django_settings
+    rpm = getattr(django_settings, 'ANTHROPIC_REQUESTS_PER_MINUTE', 0)
+    tpm = getattr(django_settings, 'ANTHROPIC_INPUT_TOKENS_PER_MINUTE', 0)
+    if not (rpm or tpm):
+        return None
+    return _get_rate_limiter(rpm, tpm)
+
+
+def _estimate_input_tokens(request_kwargs: dict) -> int:
+    """Rough input-token count of a messages.create request: ~4 chars per token plus a fixed cost per image."""
+    chars = sum(len(block['text']) for block in request_kwargs['system'])
+    chars += len(json.dumps(request_kwargs['output_config']['format']['schema']))
+    images = 0
+    for block in request_kwargs['messages'][0]['content']:
+        if block['type'] == 'image':
+            images += 1
+        else:
+            chars += len(block['text'])
+    return chars // 4 + images * _IMAGE_TOKEN_ESTIMATE
+
+
+def _image_media_type(path: Path) -> str:
+    """MIME type of a prepared page image (PNG stays PNG, everything else is sent as JPEG)."""
+    return 'image/png' if path.suffix.lower() == '.png' else 'image/jpeg'
+
+
+def _files_api_enabled() -> bool:
+    """True if page images go to Anthropic through the Files API (see _files_api_id)."""
+    from django.conf import settings as django_settings
+    return bool(getattr(django_settings, 'LOGBOOK_IMPORT_ANTHROPIC_FILES_API', False))
+
+
+def _files_api_id(client, path: Path) -> str:
+    """
+    Upload a prepared page image through the Files API once; return its file_id.
+
+    The upload carries the raw prepared bytes from _get_image_bytes(); no
+    base64 form is built for pages sent this way.
+
+    Memoised per client and page file (path, mtime, size), so the overlap
+    page shared by consecutive batches, truncation re-splits and retries all
+    reference the same upload.  A caller asking for a page that is still
+    being uploaded waits for that upload rather than preparing the page
+    again.  Uploads are deleted again by _delete_uploaded_files() when the
+    import finishes.
+    """
+    stat = path.stat()
+    key = (id(client), str(path), stat.st_mtime_ns, stat.st_size)
+    with _files_api_lock:
+        file_id = _files_api_ids.get(key)
+        if file_id is not None:
+            return file_id
+        pending = _files_api_pending.get(key)
+        if pending is None:
+            pending = _files_api_pending[key] = Future()
+            owner = True
+        else:
+            owner = False
+    if not owner:
+        return pending.result()
+
+    try:
+        uploaded = client.beta.files.upload(
+            file=(path.name, _get_image_bytes(path), _image_media_type(path)),
+            betas=[_FILES_API_BETA],
+        )
+    except BaseException as exc:
+        pending.set_exception(exc)
+        raise
+    else:
+        with _files_api_lock:
+            _files_api_ids[key] = uploaded.id
+        pending.set_result(uploaded.id)
+        return uploaded.id
+    finally:
+        with _files_api_lock:
+            _files_api_pending.pop(key, None)
+
+
+def _delete_uploaded_files(client, image_paths: List[Path]) -> None:
+    """Delete the Files API uploads made for image_paths by _files_api_id()."""
+    paths = {str(path) for path in image_paths}
+    with _files_api_lock:
+        keys = [key for key in _files_api_ids if key[0] == id(client) and key[1] in paths]
+        file_ids = [_files_api_ids.pop(key) for key in keys]
+    for file_id in file_ids:
+        try:
+            client.beta.files.delete(file_id, betas=[_FILES_API_BETA])
+        except Exception:
+            logging.getLogger(__name__).warning("Could not delete uploaded file %s", file_id, exc_info=True)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_anthropic_client(api_key: str):
+    """
+    Return a process-wide Anthropic client for api_key.
+
+    The SDK client owns an httpx connection pool; sharing it keeps TLS
+    connections to the API alive across batches and across imports instead
+    of reconnecting for every job.  The pool is sized for the largest
+    LOGBOOK_IMPORT_CONCURRENCY anyone is likely to configure.
+    """
+    import anthropic
+    import httpx
+
+    return anthropic.Anthropic(
+        api_key=api_key,
+        http_client=anthropic.DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16, keepalive_expiry=30.0),
+        ),
+    )
+
+
+def _make_ollama_client(base_url: str, pool_size: int = 1) -> Tuple[str, 'requests.Session']:
+    """
+    Return a (base_url, requests.Session) pair for _call_ollama.
+
+    One keep-alive session is shared by every batch of an import, with enough
+    pooled connections for each concurrently in-flight request. The caller
+    closes the session when the import is done.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return base_url, session
 
 
 def _call_ollama(
-    base_url: str,
+    client: Tuple[str, 'requests.Session'],
     batch_files: List[Path],
     model: str,
     prior_context_text: Optional[str] = None,
+    prefetched_images: Optional[List[Future]] = None,
 ) -> dict:
     """
     Send a batch of images to a local Ollama instance; return dict with keys:
       'data'          — parsed JSON response
       'truncated'     — True if done_reason was 'length'
       'output_tokens' — number of output tokens used (eval_count)
-    """
-    import requests
+      'degraded'      — True if an invalid response was replaced with an empty one
 
+    client is the (base_url, session) pair from _make_ollama_client().
+    """
+    base_url, session = client
     log = logging.getLogger(__name__)
 
     images = []
     image_labels = []
-    for local_idx, image_path in enumerate(batch_files):
-        image_bytes = _get_image_bytes(image_path)
-        image_b64 = base64.standard_b64encode(image_bytes).decode('utf-8')
+    batch_images = _batch_images_b64(batch_files, prefetched_images)
+    for local_idx, (image_path, image_b64) in enumerate(zip(batch_files, batch_images)):
         images.append(image_b64)
         image_labels.append(f"Page {local_idx} ({image_path.name})")
 
@@ -669,30 +1707,42 @@ def _call_ollama(
     from django.conf import settings as django_settings
     timeout = getattr(django_settings, 'OLLAMA_TIMEOUT', 1200)
 
-    resp = requests.post(
+    # Serialise once, compactly, rather than letting requests re-encode the
+    # payload with its default separators — the base64 images dominate the
+    # body and the output is pure ASCII, so no further text encoding is needed.
+    body = json.dumps(payload, separators=(',', ':')).encode('ascii')
+    resp = session.post(
         f"{base_url}/api/chat",
-        json=payload,
+        data=body,
+        headers={'Content-Type': 'application/json'},
         timeout=timeout,
     )
     resp.raise_for_status()
-    result = resp.json()
+    result = json.loads(resp.content)
 
     truncated = result.get('done_reason') == 'length'
     output_tokens = result.get('eval_count', 0)
 
     data = {}
+    degraded = False
     if not truncated:
         raw_content = result.get('message', {}).get('content', '{}')
         try:
             data = json.loads(raw_content)
         except json.JSONDecodeError:
             log.warning("Ollama returned invalid JSON: %s", raw_content[:200])
+            data = None
+        if not _check_extract_shape(data):
+            if data is not None:
+                log.warning("Ollama response does not match the extraction schema: %s", raw_content[:200])
             data = {'entries': [], 'non_logbook_pages': [], 'unparseable_pages': []}
+            degraded = True
 
     return {
         'data': data,
         'truncated': truncated,
         'output_tokens': output_tokens,
+        'degraded': degraded,
     }
 
 
@@ -701,10 +1751,11 @@ def _call_litellm(
     batch_files: List[Path],
     model: str,
     prior_context_text: Optional[str] = None,
+    prefetched_images: Optional[List[Future]] = None,
 ) -> dict:
     """
     Send a batch of images to a LiteLLM proxy via the OpenAI-compatible API.
-    Returns dict with keys: 'data', 'truncated', 'output_tokens'.
+    Returns dict with keys: 'data', 'truncated', 'output_tokens', 'degraded'.
     Raises openai.APIError on unrecoverable errors (proxy handles retries internally).
     """
     user_content = []
@@ -712,14 +1763,12 @@ def _call_litellm(
     if prior_context_text:
         user_content.append({'type': 'text', 'text': prior_context_text})
 
-    for local_idx, image_path in enumerate(batch_files):
+    batch_images = _batch_images_b64(batch_files, prefetched_images)
+    for local_idx, (image_path, image_b64) in enumerate(zip(batch_files, batch_images)):
         user_content.append({'type': 'text', 'text': f"Page {local_idx} ({image_path.name}):"})
-        image_bytes = _get_image_bytes(image_path)
-        image_b64 = base64.standard_b64encode(image_bytes).decode('utf-8')
-        media_type = 'image/png' if image_path.suffix.lower() == '.png' else 'image/jpeg'
         user_content.append({
             'type': 'image_url',
-            'image_url': {'url': f"data:{media_type};base64,{image_b64}"},
+            'image_url': {'url': f"data:{_image_media_type(image_path)};base64,{image_b64}"},
         })
 
     user_content.append({
@@ -745,6 +1794,7 @@ def _call_litellm(
     output_tokens = getattr(response.usage, 'completion_tokens', 0)
 
     data = {}
+    degraded = False
     if not truncated:
         raw = response.choices[0].message.content or '{}'
         try:
@@ -753,15 +1803,55 @@ def _call_litellm(
             logging.getLogger(__name__).warning(
                 "LiteLLM returned invalid JSON: %s", raw[:200]
             )
+            data = None
+        if not _check_extract_shape(data):
+            if data is not None:
+                logging.getLogger(__name__).warning(
+                    "LiteLLM response does not match the extraction schema: %s", raw[:200]
+                )
             data = {'entries': [], 'non_logbook_pages': [], 'unparseable_pages': []}
+            degraded = True
 
     return {
         'data': data,
         'truncated': truncated,
         'output_tokens': output_tokens,
+        'degraded': degraded,
     }
 
 
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_extract_shape(data) -> bool:
+    """
+    Return True if a parsed response has the shape the merge code relies on.
+
+    Only the structure is checked — lists where lists belong, entry objects,
+    integer page indices, string text; field values are normalised later by
+    _validate_entry().  Absent lists and null fields are allowed (treated as
+    empty, or as the batch's first page).
+    """
+    if not isinstance(data, dict):
+        return False
+    for key in _EXTRACT_LIST_KEYS:
+        if not isinstance(data.get(key) or [], list):
+            return False
+    for entry in data.get('entries') or []:
+        if not isinstance(entry, dict):
+            return False
+        if not all(_is_int(entry[f]) for f in _ENTRY_INT_FIELDS if entry.get(f) is not None):
+            return False
+        if not isinstance(entry.get('text') or '', str):
+            return False
+    return all(
+        _is_int(i)
+        for key in ('non_logbook_pages', 'unparseable_pages')
+        for i in data.get(key) or []
+    )
+
+
 def _retry_after(exc, default_backoff: float) -> float:
     """Extract retry-after seconds from an API error, falling back to default_backoff."""
     headers = getattr(exc, 'response', None)
@@ -776,14 +1866,34 @@ def _retry_after(exc, default_backoff: float) -> float:
     return default_backoff
 
 
-def _upload_images(
-    document: Document,
+def _jittered(wait: float) -> float:
+    """
+    Stretch a retry wait by a random 0–25%.
+
+    Concurrent batches rate-limited together get the same Retry-After; the
+    jitter spreads their retries out instead of sending them all at once,
+    and never retries earlier than the server asked.
+    """
+    return wait * random.uniform(1.0, 1.0 + _RETRY_JITTER)
+
+
+def _store_images(
+    doc_images: List[DocumentImage],
     image_paths: List[Path],
     non_logbook_pages: Set[int],
     unparseable_pages: Set[int],
     page_offset: int = 0,
 ) -> Iterator[dict]:
-    """Generator: uploads images and yields 'image' progress events."""
+    """Generator: writes page images to storage and yields 'image' progress events.
+
+    Appends an unsaved DocumentImage to doc_images as soon as each file is
+    stored, so if this fails or is closed part-way the caller still holds
+    every stored file and can delete them.  The instances have no document
+    yet; _save_document_images inserts them.  Nothing here touches the
+    database, so callers run it before opening their transaction.
+    bulk_create skips post_save, so file_size is filled in here instead of by
+    the signal handler.
+    """
     total = len(image_paths)
     for idx, image_path in enumerate(image_paths):
         tags = []
@@ -796,9 +1906,11 @@ def _upload_images(
         if tags:
             notes += f" [{', '.join(tags)}]"
 
-        doc_image = DocumentImage(document=document, notes=notes, order=page_offset + idx)
+        doc_image = DocumentImage(notes=notes, order=page_offset + idx)
         with open(image_path, 'rb') as fh:
-            doc_image.image.save(image_path.name, File(fh), save=True)
+            doc_image.image.save(image_path.name, File(fh), save=False)
+        doc_images.append(doc_image)
+        doc_image.file_size = doc_image.image.size
 
         yield {
             'type': 'image',
@@ -810,30 +1922,69 @@ def _upload_images(
         }
 
 
-def _create_single_entry(aircraft, document: Document, entry: dict, page_offset: int = 0) -> Optional[str]:
+def _save_document_images(document: Document, doc_images: List[DocumentImage]):
+    """Insert the DocumentImage rows for already-stored files."""
+    for doc_image in doc_images:
+        doc_image.document = document
+    DocumentImage.objects.bulk_create(doc_images, batch_size=_BULK_CREATE_BATCH_SIZE)
+
+
+def _delete_stored_images(doc_images: List[DocumentImage]):
+    """Best-effort removal of stored files whose rows were never committed."""
+    for doc_image in doc_images:
+        try:
+            doc_image.image.delete(save=False)
+        except Exception:
+            logging.getLogger(__name__).warning("Could not delete stored image %s", doc_image.image.name, exc_info=True)
+
+
+def _parse_entry_date(value):
     """
-    Create one LogbookEntry from an extracted entry dict.
-    Returns None on success, or an error string describing why it was skipped.
+    Parse a YYYY-MM-DD date.
+
+    Slices the common zero-padded form directly (strptime is slow); anything
+    else goes through strptime, so accepted input and errors are unchanged.
+    """
+    s = str(value)
+    if (len(s) == 10 and s[4] == '-' and s[7] == '-'
+            and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit()):
+        return date(int(s[:4]), int(s[5:7]), int(s[8:]))
+    return datetime.strptime(s, '%Y-%m-%d').date()
+
+
+def _validate_entry(
+    aircraft, document: Document, entry: dict, page_offset: int = 0,
+) -> Tuple[Optional[LogbookEntry], Optional[str]]:
+    """
+    Build one unsaved LogbookEntry from an extracted entry dict.
+    Returns (entry, None) on success, or (None, error string describing why
+    it was skipped).  Callers save the instances in bulk.
     """
     date_raw = entry.get('date')
     if not date_raw:
-        return 'no date'
+        return None, 'no date'
     try:
-        date = datetime.strptime(str(date_raw), '%Y-%m-%d').date()
+        entry_date = _parse_entry_date(date_raw)
     except (ValueError, TypeError):
-        return f"unparseable date: {date_raw!r}"
+        return None, f"unparseable date: {date_raw!r}"
 
     text = (entry.get('text') or '').strip()
     if not text:
-        return 'empty text'
-
-    log_type = str(entry.get('log_type') or 'AC').upper()
-    if log_type not in VALID_LOG_TYPES:
-        log_type = 'AC'
-
-    entry_type = str(entry.get('entry_type') or 'OTHER').upper()
-    if entry_type not in VALID_ENTRY_TYPES:
-        entry_type = 'OTHER'
+        return None, 'empty text'
+
+    # Models almost always return the canonical spelling; only normalise
+    # case when they don't.
+    log_type = entry.get('log_type')
+    if not (isinstance(log_type, str) and log_type in VALID_LOG_TYPES):
+        log_type = str(log_type or 'AC').upper()
+        if log_type not in VALID_LOG_TYPES:
+            log_type = 'AC'
+
+    entry_type = entry.get('entry_type')
+    if not (isinstance(entry_type, str) and entry_type in VALID_ENTRY_TYPES):
+        entry_type = str(entry_type or 'OTHER').upper()
+        if entry_type not in VALID_ENTRY_TYPES:
+            entry_type = 'OTHER'
 
     signoff_person = (entry.get('signoff_person') or '').strip()
     signoff_location = (entry.get('signoff_location') or '').strip()
@@ -848,18 +1999,17 @@ def _create_single_entry(aircraft, document: Document, entry: dict, page_offset:
     if page_number is not None:
         page_number = page_offset + page_number + 1
 
-    LogbookEntry.objects.create(
+    return LogbookEntry(
         aircraft=aircraft,
         log_type=log_type,
         entry_type=entry_type,
-        date=date,
+        date=entry_date,
         text=text,
         signoff_person=signoff_person,
         signoff_location=signoff_location,
         log_image=document,
         page_number=page_number,
-    )
-    return None
+    ), None
 
 
 # ---------------------------------------------------------------------------
@@ -890,23 +2040,43 @@ def run_import_job(job_id, tmpdir, image_paths, **kwargs):
         for path in (Path(image_path) for image_path in image_paths)
     ]
 
+    # Events are written in batches: every _JOB_SAVE_EVERY events or
+    # _JOB_SAVE_INTERVAL seconds, and immediately for events that precede a
+    # long wait (a batch being sent) or matter to the poller (errors,
+    # completion).  Nothing is written while run_import's DB transaction is
+    # open: those rows would roll back with a failed import, and append_events
+    # would hold the job row lock until the import commits.  Events from that
+    # phase stay pending and are written once the transaction has ended.
+    pending: list = []
+    last_save = time.monotonic()
+    connection = transaction.get_connection()
+    outer_atomic_depth = len(connection.atomic_blocks)
+
     try:
         aircraft = job.aircraft
         for event in run_import(aircraft=aircraft, image_paths=image_paths, **kwargs):
-            job.events.append(event)
+            pending.append(event)
             if event.get('type') == 'complete':
                 job.result = event
-            job.save(update_fields=['events', 'result', 'updated_at'])
-
+            if len(connection.atomic_blocks) > outer_atomic_depth:
+                continue
+            if (event.get('type') in _JOB_SAVE_NOW_EVENTS
+                    or len(pending) >= _JOB_SAVE_EVERY
+                    or time.monotonic() - last_save >= _JOB_SAVE_INTERVAL):
+                job.append_events(pending)
+                pending = []
+                last_save = time.monotonic()
+
+        job.append_events(pending)
         job.status = 'completed'
-        job.save(update_fields=['status', 'updated_at'])
+        job.save(update_fields=['result', 'status', 'updated_at'])
 
     except Exception:
         log.exception("ImportJob %s failed", job_id)
         error_event = _ev('error', 'An unexpected error occurred during import.')
-        job.events.append(error_event)
+        job.append_events(pending + [error_event])
         job.status = 'failed'
-        job.save(update_fields=['events', 'status', 'updated_at'])
+        job.save(update_fields=['status', 'updated_at'])
 
     finally:
         shutil.rmtree(tmpdir, ignore_errors=True)
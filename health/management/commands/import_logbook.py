@@ -8,6 +8,8 @@ Usage:
     python manage.py import_logbook /path/to/images --aircraft N5516G
     python manage.py import_logbook /path/to/images --aircraft N5516G --model claude-haiku-4-5-20251001
     python manage.py import_logbook /path/to/images --aircraft N5516G --dry-run
+    python manage.py import_logbook /path/to/images --aircraft N5516G --concurrency 4
+    python manage.py import_logbook /path/to/images --aircraft N5516G --use-batch-api
     python manage.py import_logbook /path/to/images --aircraft N5516G --upload-only
 
 Environment variables:
@@ -16,6 +18,7 @@ Environment variables:
 
 import os
 from pathlib import Path
+from typing import Optional
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
@@ -24,6 +27,11 @@ from core.models import Aircraft
 from health.logbook_import import SUPPORTED_EXTENSIONS, run_import
 
 
+def _model_registry() -> dict:
+    """Return settings.LOGBOOK_IMPORT_MODELS indexed by model ID."""
+    return {m['id']: m for m in settings.LOGBOOK_IMPORT_MODELS}
+
+
 class Command(BaseCommand):
     help = (
         "Import aircraft logbook pages from a directory of images using AI for transcription. "
@@ -77,6 +85,24 @@ class Command(BaseCommand):
                 "Batches overlap by 1 page to catch cross-page entries."
             ),
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            metavar="N",
+            help=(
+                "AI batches in flight at once (default: settings.LOGBOOK_IMPORT_CONCURRENCY). "
+                "Values above 1 are faster but skip carry-forward context between batches."
+            ),
+        )
+        parser.add_argument(
+            "--use-batch-api",
+            action="store_true",
+            help=(
+                "Submit all batches as one Anthropic Message Batches job (anthropic models only). "
+                "Half the cost, but results can take minutes to hours."
+            ),
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
@@ -100,14 +126,29 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        # Resolve model and provider from settings registry before any file or
+        # DB work. This checks an explicit --model as well as a misconfigured
+        # LOGBOOK_IMPORT_DEFAULT_MODEL.
+        model_registry = _model_registry()
+        model_id = options["model"] or settings.LOGBOOK_IMPORT_DEFAULT_MODEL
+        if model_id not in model_registry:
+            raise CommandError(
+                f"Unknown model '{model_id}'. "
+                f"Available models: {list(model_registry)}"
+            )
+        provider = model_registry[model_id]['provider']
+
         directory = Path(options["directory"]).expanduser().resolve()
         if not directory.is_dir():
             raise CommandError(f"Directory does not exist: {directory}")
 
-        image_files = sorted(
-            f for f in directory.iterdir()
-            if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-        )
+        # scandir's DirEntry.is_file() normally answers from the directory
+        # listing itself, without a stat() per file.
+        with os.scandir(directory) as it:
+            image_files = sorted(
+                Path(entry.path) for entry in it
+                if os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS and entry.is_file()
+            )
         if not image_files:
             raise CommandError(f"No supported image files found in {directory}")
 
@@ -124,16 +165,8 @@ class Command(BaseCommand):
         collection_name = options["collection_name"] or directory.name
         doc_name = options["doc_name"] or directory.name
 
-        # Resolve model and provider from settings registry
-        model_id = options["model"] or settings.LOGBOOK_IMPORT_DEFAULT_MODEL
-        model_registry = {m['id']: m for m in settings.LOGBOOK_IMPORT_MODELS}
-        if model_id not in model_registry:
-            available = [m['id'] for m in settings.LOGBOOK_IMPORT_MODELS]
-            raise CommandError(
-                f"Unknown model '{model_id}'. "
-                f"Available models: {available}"
-            )
-        provider = model_registry[model_id]['provider']
+        if options["concurrency"] is not None and options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
 
         if options["dry_run"]:
             self.stdout.write(self.style.WARNING("\nDRY RUN — no database records will be created\n"))
@@ -152,12 +185,14 @@ class Command(BaseCommand):
             upload_only=options["upload_only"],
             log_type_override=options["log_type"],
             batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            use_batch_api=options["use_batch_api"],
         )
         result = None
         for event in generator:
-            self._render_event(event)
-            if event.get("type") == "complete":
-                result = event
+            complete = self._render_event(event)
+            if complete is not None:
+                result = complete
 
         if result:
             self.stdout.write(f"\n  DocumentCollection ID : {result['collection_id']}")
@@ -166,9 +201,9 @@ class Command(BaseCommand):
     # -------------------------------------------------------------------------
 
     def _get_aircraft(self, tail_number: str) -> Aircraft:
-        qs = Aircraft.objects.filter(tail_number__iexact=tail_number)
-        count = qs.count()
-        if count == 0:
+        # At most two rows are needed to tell "one match" from "ambiguous"
+        matches = list(Aircraft.objects.filter(tail_number__iexact=tail_number)[:2])
+        if not matches:
             available = list(
                 Aircraft.objects.values_list("tail_number", flat=True).order_by("tail_number")
             )
@@ -176,15 +211,17 @@ class Command(BaseCommand):
                 f"Aircraft '{tail_number}' not found. "
                 f"Available: {available or '(none)'}"
             )
-        if count > 1:
-            ids = list(qs.values_list("id", flat=True))
+        if len(matches) > 1:
+            ids = list(
+                Aircraft.objects.filter(tail_number__iexact=tail_number).values_list("id", flat=True)
+            )
             raise CommandError(
                 f"Multiple aircraft found with tail number '{tail_number}': {ids}"
             )
-        return qs.get()
+        return matches[0]
 
-    def _render_event(self, event: dict):
-        """Map an event dict to styled terminal output."""
+    def _render_event(self, event: dict) -> Optional[dict]:
+        """Map an event dict to styled terminal output; returns the event if it is 'complete'."""
         kind = event.get("type", "info")
         message = event.get("message", "")
 
@@ -194,6 +231,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f"  ⚠ {message}"))
         elif kind == "complete":
             self.stdout.write(self.style.SUCCESS(f"\n✓ {message}"))
+            return event
         elif kind == "entry":
             conf = event.get("confidence", "high")
             conf_mark = "" if conf == "high" else f" [{conf}]"
@@ -211,24 +249,32 @@ class Command(BaseCommand):
             )
         elif kind == "batch":
             self.stdout.write(f"\n{message}")
+        elif kind == "batch_status":
+            self.stdout.write(self.style.HTTP_INFO(f"  … {message}"))
         else:
             self.stdout.write(f"  {message}")
 
     def _dry_run(self, aircraft, image_files, options, model_id, provider):
         """Extract via AI and display results without writing to DB."""
-        from health.logbook_import import _extract_all_entries
+        from health.logbook_import import (
+            _dedupe_pages, _extract_all_entries, _extract_all_entries_batched, _get_anthropic_client,
+            _iter_in_thread, _make_ollama_client, _restore_page_indices, _with_provider_cleanup,
+        )
 
         if provider == 'anthropic':
             api_key = os.environ.get("ANTHROPIC_API_KEY")
             if not api_key:
                 raise CommandError("ANTHROPIC_API_KEY environment variable is not set")
             try:
-                import anthropic
+                import anthropic  # noqa: F401
             except ImportError:
                 raise CommandError("The 'anthropic' package is not installed")
-            provider_client = anthropic.Anthropic(api_key=api_key)
+            provider_client = _get_anthropic_client(api_key)
         elif provider == 'ollama':
-            provider_client = settings.OLLAMA_BASE_URL
+            provider_client = _make_ollama_client(
+                settings.OLLAMA_BASE_URL,
+                options["concurrency"] or getattr(settings, 'LOGBOOK_IMPORT_CONCURRENCY', 1),
+            )
         elif provider == 'litellm':
             base_url = getattr(settings, 'LITELLM_BASE_URL', '')
             if not base_url:
@@ -246,35 +292,61 @@ class Command(BaseCommand):
         non_logbook_pages = set()
         unparseable_pages = set()
 
-        for event in _extract_all_entries(
-            provider, provider_client, image_files, model_id, options["batch_size"],
-            all_entries, non_logbook_pages, unparseable_pages,
+        # Same duplicate-page handling as run_import, so the dry run sends and
+        # reports exactly what a real import would
+        extract_paths, page_groups = _dedupe_pages(image_files)
+        if len(extract_paths) < len(image_files):
+            self.stdout.write(
+                f"  Skipping {len(image_files) - len(extract_paths)} duplicate page image(s) for extraction"
+            )
+
+        if options["use_batch_api"] and provider == 'anthropic':
+            extraction = _extract_all_entries_batched(
+                provider_client, extract_paths, model_id, options["batch_size"],
+                all_entries, non_logbook_pages, unparseable_pages,
+            )
+        else:
+            if options["use_batch_api"]:
+                self.stdout.write(self.style.WARNING(
+                    f"  ⚠ Batch API is not supported by provider {provider} — using live requests"
+                ))
+            extraction = _extract_all_entries(
+                provider, provider_client, extract_paths, model_id, options["batch_size"],
+                all_entries, non_logbook_pages, unparseable_pages,
+                concurrency=options["concurrency"],
+            )
+
+        # As in run_import, extraction runs on its own thread so terminal
+        # output never holds up the model calls.  The provider client is
+        # released on that thread once its calls are done, including any
+        # page images uploaded through the Files API.
+        for event in _iter_in_thread(
+            _with_provider_cleanup(extraction, provider, provider_client, extract_paths)
         ):
             self._render_event(event)
+        if len(extract_paths) < len(image_files):
+            _restore_page_indices(page_groups, all_entries, non_logbook_pages, unparseable_pages)
 
         if options["log_type"]:
             for e in all_entries:
                 e["log_type"] = options["log_type"]
 
-        self.stdout.write(f"\n{'='*70}")
-        self.stdout.write(f"EXTRACTED ENTRIES ({len(all_entries)} total)")
-        self.stdout.write("="*70)
+        # Built as one block and written once rather than line by line
+        lines = [f"\n{'='*70}", f"EXTRACTED ENTRIES ({len(all_entries)} total)", "="*70]
         for i, entry in enumerate(all_entries, 1):
             ps, pe = entry.get("page_start", "?"), entry.get("page_end", "?")
             pages = f"{ps}" if ps == pe else f"{ps}–{pe}"
-            conf = entry.get("confidence", "?")
-            self.stdout.write(
+            lines.append(
                 f"\n[{i:>3}] {entry.get('date') or 'NO DATE'}  "
                 f"{entry.get('log_type')}/{entry.get('entry_type')}  "
-                f"pages:{pages}  conf:{conf}"
+                f"pages:{pages}  conf:{entry.get('confidence', '?')}"
             )
             if entry.get("aircraft_hours_at_entry"):
-                self.stdout.write(f"       Hours: {entry['aircraft_hours_at_entry']}")
+                lines.append(f"       Hours: {entry['aircraft_hours_at_entry']}")
             if entry.get("signoff_person"):
-                self.stdout.write(f"       Signoff: {entry['signoff_person']}")
-            text = (entry.get("text") or "")[:300]
-            for line in text.splitlines():
-                self.stdout.write(f"       {line}")
+                lines.append(f"       Signoff: {entry['signoff_person']}")
+            lines.extend(f"       {line}" for line in (entry.get("text") or "")[:300].splitlines())
 
+        self.stdout.write("\n".join(lines))
         self.stdout.write(f"\nNon-logbook pages: {sorted(non_logbook_pages)}")
         self.stdout.write(f"Unparseable pages: {sorted(unparseable_pages)}")
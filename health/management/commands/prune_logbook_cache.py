@@ -0,0 +1,33 @@
+"""
+Delete old files from the logbook import response cache (LOGBOOK_IMPORT_CACHE_DIR).
+Intended to be run periodically, e.g. daily from cron. Does nothing when the
+cache is disabled.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from health.logbook_import import prune_response_cache
+
+
+class Command(BaseCommand):
+    help = "Delete logbook import cache files older than the given age (default: 30 days)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=float,
+            default=30,
+            metavar="N",
+            help="Delete cache files last written more than N days ago (default: 30).",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days must not be negative")
+        if not settings.LOGBOOK_IMPORT_CACHE_DIR:
+            self.stdout.write("LOGBOOK_IMPORT_CACHE_DIR is not set — nothing to prune.")
+            return
+        removed = prune_response_cache(options["days"] * 24 * 3600)
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed} cache file(s) from {settings.LOGBOOK_IMPORT_CACHE_DIR}"
+        ))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.13 on 2026-10-16 12:00
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def copy_events_to_rows(apps, schema_editor):
+    ImportJob = apps.get_model('health', 'ImportJob')
+    ImportJobEvent = apps.get_model('health', 'ImportJobEvent')
+    for job in ImportJob.objects.only('id', 'events').iterator():
+        if not job.events:
+            continue
+        ImportJobEvent.objects.bulk_create([
+            ImportJobEvent(job_id=job.id, seq=seq, payload=event)
+            for seq, event in enumerate(job.events)
+        ])
+
+
+def copy_rows_to_events(apps, schema_editor):
+    ImportJob = apps.get_model('health', 'ImportJob')
+    ImportJobEvent = apps.get_model('health', 'ImportJobEvent')
+    for job in ImportJob.objects.filter(event_log__isnull=False).distinct().iterator():
+        job.events = list(
+            ImportJobEvent.objects.filter(job_id=job.id).order_by('seq').values_list('payload', flat=True)
+        )
+        job.save(update_fields=['events'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJobEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('seq', models.PositiveIntegerField()),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_log', to='health.importjob')),
+            ],
+            options={
+                'ordering': ['seq'],
+                'constraints': [models.UniqueConstraint(fields=('job', 'seq'), name='unique_import_job_event_seq')],
+            },
+        ),
+        migrations.RunPython(copy_events_to_rows, copy_rows_to_events),
+        migrations.RemoveField(
+            model_name='importjob',
+            name='events',
+        ),
+    ]
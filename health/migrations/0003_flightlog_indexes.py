@@ -0,0 +1,21 @@
+# Generated by Django 5.2.13 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health', '0002_importjobevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['aircraft', '-date', '-created_at'], name='flightlog_ac_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['-date', '-created_at'], name='flightlog_date_created_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.13 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health', '0003_flightlog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logbookentry',
+            index=models.Index(fields=['aircraft', '-date'], name='logentry_ac_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='squawk',
+            index=models.Index(condition=models.Q(('resolved', False)), fields=['aircraft', 'priority'], name='squawk_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionrecord',
+            index=models.Index(fields=['inspection_type', '-date'], name='insprecord_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionrecord',
+            index=models.Index(fields=['aircraft', '-date'], name='insprecord_ac_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adcompliance',
+            index=models.Index(fields=['ad', '-date_complied'], name='adcompliance_ad_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adcompliance',
+            index=models.Index(fields=['aircraft', '-date_complied'], name='adcompliance_ac_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consumablerecord',
+            index=models.Index(fields=['aircraft', 'record_type', '-date'], name='consumable_ac_type_date_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.conf import settings
 from django.core.validators import FileExtensionValidator
-from django.db import models
+from django.db import models, transaction
 
 from core import models as core_models
 from core.models import make_upload_path
@@ -85,13 +85,13 @@ class Component(models.Model):
     replacement_critical = models.BooleanField(default=False)
 
     def __str__(self):
-        ret_string = f"{self.component_type.name}"
+        parts = [self.component_type.name]
         if self.aircraft:
-            ret_string += f" - {self.aircraft.tail_number}"
+            parts.append(self.aircraft.tail_number)
         if self.install_location:
-            ret_string += f" - {self.install_location}"
-        ret_string += f" - {self.status}"
-        return ret_string
+            parts.append(self.install_location)
+        parts.append(self.status)
+        return " - ".join(parts)
 
     def hours_to_tbo(self):
         """Hours remaining until TBO"""
@@ -101,11 +101,7 @@ class Component(models.Model):
 
     def is_due_for_service(self):
         """Check if component needs service"""
-        return any([
-            self.tbo_critical,
-            self.inspection_critical,
-            self.replacement_critical
-        ])
+        return self.tbo_critical or self.inspection_critical or self.replacement_critical
 
 class DocumentCollection(models.Model):
     id = models.UUIDField(primary_key=True, blank=False, default=uuid.uuid4, editable=False)
@@ -117,11 +113,8 @@ class DocumentCollection(models.Model):
     starred = models.BooleanField(default=False)
 
     def __str__(self):
-        ret_string = ""
-        if self.aircraft:
-            ret_string += f"{self.aircraft.tail_number}"
-        ret_string += f" - {self.name}"
-        return ret_string
+        tail = self.aircraft.tail_number if self.aircraft else ""
+        return f"{tail} - {self.name}"
 
 
 class Document(models.Model):
@@ -135,13 +128,9 @@ class Document(models.Model):
     visibility = models.CharField(max_length=20, choices=DOCUMENT_VISIBILITY_CHOICES, null=True, blank=True, default=None)
 
     def __str__(self):
-        ret_string = ""
-        if self.aircraft:
-            ret_string += f"{self.aircraft.tail_number}"
-        ret_string += f" - {self.doc_type}"
-        if self.collection:
-            ret_string += f" - {self.collection.name}"
-        return ret_string
+        tail = self.aircraft.tail_number if self.aircraft else ""
+        collection = f" - {self.collection.name}" if self.collection else ""
+        return f"{tail} - {self.doc_type}{collection}"
 
 class DocumentImage(models.Model):
     id = models.UUIDField(primary_key=True, blank=False, default=uuid.uuid4, editable=False)
@@ -160,9 +149,7 @@ class DocumentImage(models.Model):
         ordering = ['order']
 
     def __str__(self):
-        ret_string = "Doc Image"
-        ret_string += f" - {self.document.name}"
-        return ret_string
+        return f"Doc Image - {self.document.name}"
 
 class LogbookEntry(models.Model):
     id = models.UUIDField(primary_key=True, blank=False, default=uuid.uuid4, editable=False)
@@ -201,13 +188,14 @@ class LogbookEntry(models.Model):
         help_text="1-based page number within the attached log_image document"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['aircraft', '-date'], name='logentry_ac_date_idx'),
+        ]
+
     def __str__(self):
-        ret_string = ""
-        if self.aircraft:
-            ret_string += f"{self.aircraft.tail_number}"
-        ret_string += f" - {self.log_type}"
-        ret_string += f" - {self.date}"
-        return ret_string
+        tail = self.aircraft.tail_number if self.aircraft else ""
+        return f"{tail} - {self.log_type} - {self.date}"
 
 class Squawk(models.Model):
     id = models.UUIDField(primary_key=True, blank=False, default=uuid.uuid4, editable=False)
@@ -223,15 +211,17 @@ class Squawk(models.Model):
     logbook_entries = models.ManyToManyField(LogbookEntry, blank=True, related_name='squawks')
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Only open squawks are looked up by priority (e.g. grounding squawks)
+            models.Index(fields=['aircraft', 'priority'], name='squawk_open_idx',
+                         condition=models.Q(resolved=False)),
+        ]
+
     def __str__(self):
-        ret_string = ""
-        if self.aircraft:
-            ret_string += f"{self.aircraft.tail_number}"
-        if self.component:
-            ret_string += f"{self.component.component_type}"
-        ret_string += f" - {self.issue_reported}"
-        ret_string += f" - Resolved: {self.resolved}"
-        return ret_string
+        tail = self.aircraft.tail_number if self.aircraft else ""
+        component = self.component.component_type if self.component else ""
+        return f"{tail}{component} - {self.issue_reported} - Resolved: {self.resolved}"
 
 class InspectionType(models.Model):
     id = models.UUIDField(primary_key=True, blank=False, default=uuid.uuid4, editable=False)
@@ -354,12 +344,15 @@ class InspectionRecord(models.Model):
     aircraft = models.ForeignKey(core_models.Aircraft, related_name='inspections', on_delete=models.CASCADE, blank=True, null=True)
     component = models.ManyToManyField(Component, related_name='inspections', blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['inspection_type', '-date'], name='insprecord_type_date_idx'),
+            models.Index(fields=['aircraft', '-date'], name='insprecord_ac_date_idx'),
+        ]
+
     def __str__(self):
-        ret_string = f"{self.inspection_type}"
-        if self.aircraft:
-            ret_string += f" - {self.aircraft.tail_number}"
-        ret_string += f" - {self.date}"
-        return ret_string
+        tail = f" - {self.aircraft.tail_number}" if self.aircraft else ""
+        return f"{self.inspection_type}{tail} - {self.date}"
 
 class ADCompliance(models.Model):
     id = models.UUIDField(primary_key=True, blank=False, default=uuid.uuid4, editable=False)
@@ -374,14 +367,16 @@ class ADCompliance(models.Model):
     aircraft = models.ForeignKey(core_models.Aircraft, related_name='ad_compliance', blank=True, null=True, on_delete=models.CASCADE)
     component = models.ForeignKey(Component, related_name='ad_compliance', blank=True, null=True, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['ad', '-date_complied'], name='adcompliance_ad_date_idx'),
+            models.Index(fields=['aircraft', '-date_complied'], name='adcompliance_ac_date_idx'),
+        ]
+
     def __str__(self):
-        ret_string = f"{self.ad.name}"
-        if self.aircraft:
-            ret_string += f" - {self.aircraft.tail_number}"
-        if self.component:
-            ret_string += f"{self.component.component_type}"
-        ret_string += f" - {self.date_complied}"
-        return ret_string
+        tail = f" - {self.aircraft.tail_number}" if self.aircraft else ""
+        component = self.component.component_type if self.component else ""
+        return f"{self.ad.name}{tail}{component} - {self.date_complied}"
 
 
 class ImportJob(models.Model):
@@ -406,7 +401,6 @@ class ImportJob(models.Model):
                              null=True, blank=True, related_name='import_jobs')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES, blank=True, default='')
-    events = models.JSONField(default=list)
     result = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -416,6 +410,45 @@ class ImportJob(models.Model):
             return f"ImportJob {self.id} ({self.status}) - {self.aircraft.tail_number}"
         return f"ImportJob {self.id} ({self.status})"
 
+    def append_events(self, events):
+        """
+        Append progress event dicts to this job's event log.
+
+        A job normally has a single writer, the thread or task running it.
+        The next seq is still read with the job row locked
+        (select_for_update), so concurrent appenders queue behind each other
+        instead of colliding on the (job, seq) constraint.
+        """
+        if not events:
+            return
+        with transaction.atomic():
+            ImportJob.objects.select_for_update().filter(pk=self.pk).values_list('pk').get()
+            last_seq = self.event_log.aggregate(last=models.Max('seq'))['last']
+            start = 0 if last_seq is None else last_seq + 1
+            ImportJobEvent.objects.bulk_create([
+                ImportJobEvent(job=self, seq=seq, payload=event)
+                for seq, event in enumerate(events, start)
+            ])
+
+    def events_after(self, after=0):
+        """Return the event dicts from position `after` onward, oldest first."""
+        return list(self.event_log.filter(seq__gte=after).values_list('payload', flat=True))
+
+
+class ImportJobEvent(models.Model):
+    """One progress event of an ImportJob; appended as its own row."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='event_log')
+    seq = models.PositiveIntegerField()
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['seq']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'seq'], name='unique_import_job_event_seq'),
+        ]
+
 
 OIL_ANALYSIS_STATUS_CHOICES = [
     ('normal', 'Normal'),
@@ -491,6 +524,10 @@ class FlightLog(models.Model):
 
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['aircraft', '-date', '-created_at'], name='flightlog_ac_date_idx'),
+            models.Index(fields=['-date', '-created_at'], name='flightlog_date_created_idx'),
+        ]
 
     def __str__(self):
         tail = self.aircraft.tail_number if self.aircraft else '?'
@@ -519,6 +556,9 @@ class ConsumableRecord(models.Model):
 
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['aircraft', 'record_type', '-date'], name='consumable_ac_type_date_idx'),
+        ]
 
     def __str__(self):
         if self.record_type == self.RECORD_TYPE_OIL:
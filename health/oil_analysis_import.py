@@ -14,6 +14,9 @@ Public API:
 import logging
 from pathlib import Path
 
+from health.models import ImportJob
+from health.oil_analysis_parsers import parse
+
 log = logging.getLogger(__name__)
 
 
@@ -28,7 +31,6 @@ def run_extraction(pdf_path: Path, **_kwargs) -> dict:
     Extra keyword arguments (model, provider) are accepted and ignored for
     backwards compatibility with callers that still pass them.
     """
-    from health.oil_analysis_parsers import parse
     return parse(pdf_path)
 
 
@@ -42,8 +44,6 @@ def run_oil_analysis_job(job_id, pdf_path: Path, **_kwargs) -> None:
 
     Extra keyword arguments (model, provider) are accepted and ignored.
     """
-    from health.models import ImportJob
-
     try:
         job = ImportJob.objects.get(pk=job_id)
     except ImportJob.DoesNotExist:
@@ -61,10 +61,7 @@ def run_oil_analysis_job(job_id, pdf_path: Path, **_kwargs) -> None:
         job.save(update_fields=['result', 'status'])
     except Exception as exc:
         log.exception("Oil analysis job %s failed", job_id)
-        error_event = {'type': 'error', 'message': str(exc)}
-        ImportJob.objects.filter(pk=job.pk).update(
-            events=ImportJob.objects.values_list('events', flat=True).get(pk=job.pk) + [error_event]
-        )
+        job.append_events([{'type': 'error', 'message': str(exc)}])
         job.status = 'failed'
         job.save(update_fields=['status'])
     finally:
@@ -66,12 +66,12 @@ _HEX_RE  = re.compile(r'^#[0-9A-Fa-f]{1,8}$')
 
 def parse(pdf_path: Path) -> dict:
     """Detect lab and dispatch. Raises ValueError if lab unrecognized."""
-    text = _extract_text(pdf_path)
+    text, words = _read_pdf(pdf_path)
     lab = _detect_lab(text)
     if lab == 'blackstone':
-        return _parse_blackstone(pdf_path)
+        return _parse_blackstone(words)
     if lab == 'avlab':
-        return _parse_avlab(pdf_path)
+        return _parse_avlab(words)
     raise ValueError(
         "Unrecognized oil analysis lab. Expected Blackstone (blackstone-labs.com) "
         "or AVLab (avlab.com / AVIATION LABORATORIES)."
@@ -82,16 +82,30 @@ def parse(pdf_path: Path) -> dict:
 # Shared helpers
 # ---------------------------------------------------------------------------
 
-def _extract_text(pdf_path: Path) -> str:
-    """Extract plain text from all PDF pages."""
+def _read_pdf(pdf_path: Path) -> tuple[str, list]:
+    """
+    Return (plain text, words) for all PDF pages.
+
+    The document is opened once and each page's text is extracted once;
+    both the plain text and the word list are read from the same text page.
+    Words are (x0, y0, text) tuples.
+    """
     try:
         import fitz
     except ImportError:
         raise ValueError("The 'pymupdf' package is not installed (pip install pymupdf)")
     doc = fitz.open(str(pdf_path))
-    parts = [page.get_text() for page in doc]
-    doc.close()
-    return '\n'.join(parts)
+    parts = []
+    words = []
+    try:
+        for page in doc:
+            textpage = page.get_textpage()
+            parts.append(page.get_text(textpage=textpage))
+            for w in page.get_text('words', sort=True, textpage=textpage):
+                words.append((float(w[0]), float(w[1]), str(w[4])))
+    finally:
+        doc.close()
+    return '\n'.join(parts), words
 
 
 def _detect_lab(text: str) -> str:
@@ -130,21 +144,6 @@ def _parse_number(s: str) -> float | None:
         return None
 
 
-def _get_words(pdf_path: Path):
-    """Return all words as (x0, y0, text) from all pages."""
-    try:
-        import fitz
-    except ImportError:
-        raise ValueError("pymupdf not installed")
-    doc = fitz.open(str(pdf_path))
-    words = []
-    for page in doc:
-        for w in page.get_text('words', sort=True):
-            words.append((float(w[0]), float(w[1]), str(w[4])))
-    doc.close()
-    return words
-
-
 def _make_by_y(words, bucket=6):
     """Group (x, text) pairs into y-buckets of `bucket` pixels."""
     by_y = defaultdict(list)
@@ -157,8 +156,7 @@ def _make_by_y(words, bucket=6):
 # Blackstone parser
 # ---------------------------------------------------------------------------
 
-def _parse_blackstone(pdf_path: Path) -> dict:
-    words = _get_words(pdf_path)
+def _parse_blackstone(words: list) -> dict:
     by_y  = _make_by_y(words)
 
     def find_label_y(label, x_max=120, y_lo=None, y_hi=None):
@@ -376,8 +374,7 @@ def _parse_blackstone(pdf_path: Path) -> dict:
 # AVLab parser
 # ---------------------------------------------------------------------------
 
-def _parse_avlab(pdf_path: Path) -> dict:
-    words = _get_words(pdf_path)
+def _parse_avlab(words: list) -> dict:
     by_y  = _make_by_y(words)
 
     # ---- Header: tail number, report date ----
@@ -42,7 +42,13 @@ class ComponentTypeViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
 class ComponentViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets.ModelViewSet):
-    queryset = Component.objects.all()
+    # Relations rendered by ComponentSerializer, loaded per page instead of per row
+    queryset = Component.objects.select_related(
+        'component_type', 'parent_component__component_type',
+    ).prefetch_related(
+        'components', 'doc_collections', 'documents', 'squawks',
+        'applicable_inspections', 'ads', 'inspections', 'ad_compliance',
+    )
     serializer_class = ComponentSerializer
     aircraft_fk_path = 'aircraft'
     event_category = 'component'
@@ -103,7 +109,7 @@ class ComponentViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets.ModelVie
         })
 
 class DocumentCollectionViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets.ModelViewSet):
-    queryset = DocumentCollection.objects.all()
+    queryset = DocumentCollection.objects.prefetch_related('components', 'documents')
     serializer_class = DocumentCollectionSerializer
     aircraft_fk_path = 'aircraft'
     event_category = 'document'
@@ -111,7 +117,7 @@ class DocumentCollectionViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets
     filterset_fields = ['aircraft']
 
 class DocumentViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets.ModelViewSet):
-    queryset = Document.objects.all()
+    queryset = Document.objects.prefetch_related('components', 'related_logs', 'log_entry', 'images')
     serializer_class = DocumentSerializer
     aircraft_fk_path = 'aircraft'
     event_category = 'document'
@@ -127,7 +133,9 @@ class DocumentImageViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets.Mode
     aircraft_field = 'document.aircraft'
 
 class LogbookEntryViewSet(AircraftScopedMixin, EventLoggingMixin, viewsets.ModelViewSet):
-    queryset = LogbookEntry.objects.all().order_by('-date', 'id')
+    queryset = LogbookEntry.objects.select_related('log_image').prefetch_related(
+        'component', 'log_image__images', 'related_documents__images',
+    ).order_by('-date', 'id')
     serializer_class = LogbookEntrySerializer
     aircraft_fk_path = 'aircraft'
     event_category = 'logbook'
@@ -204,6 +204,35 @@ LOGBOOK_IMPORT_DEFAULT_MODEL = 'claude-sonnet-4-6'
 # No separate OIL_ANALYSIS_IMPORT_MODELS setting is needed — the same registry
 # is shown in the aircraft detail page AI extraction modal.
 
+# Max AI batches in flight at once during logbook import.  Values above 1
+# dispatch batches concurrently but drop the carry-forward context that is
+# otherwise passed from one batch to the next.
+LOGBOOK_IMPORT_CONCURRENCY = int(os.environ.get('LOGBOOK_IMPORT_CONCURRENCY', '1'))
+
+# Cap on the estimated image input tokens per AI batch (about 1600 per full
+# page).  Batches end early rather than exceed it; 0 sizes batches by page
+# count alone.
+LOGBOOK_IMPORT_BATCH_TOKEN_BUDGET = int(os.environ.get('LOGBOOK_IMPORT_BATCH_TOKEN_BUDGET', '0'))
+
+# Optional on-disk cache of AI extraction results, keyed by page image
+# content, model and prompt, so re-importing the same pages skips the API
+# calls.  Cached results contain the extracted logbook text.  Results older
+# than 30 days are ignored; run `manage.py prune_logbook_cache` periodically
+# to delete them.  Empty (the default) disables the cache.
+LOGBOOK_IMPORT_CACHE_DIR = os.environ.get('LOGBOOK_IMPORT_CACHE_DIR', '')
+
+# Optional self-throttling of logbook import calls to Anthropic, to stay
+# within your account's rate limits.  0 disables a limit.
+ANTHROPIC_REQUESTS_PER_MINUTE = int(os.environ.get('ANTHROPIC_REQUESTS_PER_MINUTE', '0'))
+ANTHROPIC_INPUT_TOKENS_PER_MINUTE = int(os.environ.get('ANTHROPIC_INPUT_TOKENS_PER_MINUTE', '0'))
+
+# Send logbook page images to Anthropic through the Files API instead of
+# inline base64.  Each page is uploaded once per import (overlap pages and
+# retries reuse it) and deleted when the import finishes.
+LOGBOOK_IMPORT_ANTHROPIC_FILES_API = os.environ.get(
+    'LOGBOOK_IMPORT_ANTHROPIC_FILES_API', 'False'
+).lower() in ('true', '1', 'yes')
+
 # Ollama connection (only needed if any model uses provider=ollama)
 OLLAMA_BASE_URL = os.environ.get('OLLAMA_BASE_URL', 'http://localhost:11434')
 OLLAMA_TIMEOUT = int(os.environ.get('OLLAMA_TIMEOUT', '1200'))
@@ -42,7 +42,7 @@ class TestCallLitellm:
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = make_mock_openai_response(EMPTY_EXTRACTION)
 
-        with patch('health.logbook_import._get_image_bytes', return_value=b'\xff\xd8'):
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
             result = _call_litellm(mock_client, [fake_image], 'some-model')
 
         assert result['truncated'] is False
@@ -60,7 +60,7 @@ class TestCallLitellm:
             EMPTY_EXTRACTION, finish_reason='length'
         )
 
-        with patch('health.logbook_import._get_image_bytes', return_value=b'\xff\xd8'):
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
             result = _call_litellm(mock_client, [fake_image], 'some-model')
 
         assert result['truncated'] is True
@@ -75,7 +75,7 @@ class TestCallLitellm:
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = make_mock_openai_response(EMPTY_EXTRACTION)
 
-        with patch('health.logbook_import._get_image_bytes', return_value=b'\xff\xd8'):
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
             _call_litellm(mock_client, [fake_image], 'some-model')
 
         call_kwargs = mock_client.chat.completions.create.call_args[1]
@@ -92,7 +92,7 @@ class TestCallLitellm:
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = make_mock_openai_response(EMPTY_EXTRACTION)
 
-        with patch('health.logbook_import._get_image_bytes', return_value=b'\xff\xd8'):
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
             _call_litellm(mock_client, [fake_image], 'some-model')
 
         call_kwargs = mock_client.chat.completions.create.call_args[1]
@@ -110,7 +110,7 @@ class TestCallLitellm:
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = make_mock_openai_response(EMPTY_EXTRACTION)
 
-        with patch('health.logbook_import._get_image_bytes', return_value=b'\xff\xd8'):
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
             _call_litellm(mock_client, [fake_image], 'some-model', prior_context_text='PRIOR CTX')
 
         call_kwargs = mock_client.chat.completions.create.call_args[1]
@@ -127,7 +127,7 @@ class TestCallLitellm:
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = make_mock_openai_response(EMPTY_EXTRACTION)
 
-        with patch('health.logbook_import._get_image_bytes', return_value=b'\xff\xd8'):
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
             _call_litellm(mock_client, [fake_image], 'some-model')
 
         call_kwargs = mock_client.chat.completions.create.call_args[1]
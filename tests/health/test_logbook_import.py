@@ -0,0 +1,1180 @@
+"""
+Tests for the batch extraction loop in health/logbook_import.py.
+Provider calls are patched out via _call_model.
+"""
+import json
+import math
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _entry(date, text, page=0):
+    return {'date': date, 'text': text, 'page_start': page, 'page_end': page}
+
+
+def _result(entries=None, truncated=False, output_tokens=10):
+    return {
+        'data': {} if truncated else {
+            'entries': entries or [],
+            'non_logbook_pages': [],
+            'unparseable_pages': [],
+        },
+        'truncated': truncated,
+        'output_tokens': output_tokens,
+    }
+
+
+def _run(image_paths, batch_size, fake_call_model, concurrency=1):
+    from health.logbook_import import _extract_all_entries
+
+    all_entries, non_logbook, unparseable = [], set(), set()
+    with patch('health.logbook_import._call_model', side_effect=fake_call_model), \
+         patch('health.logbook_import._get_image_b64', return_value='/9g='):
+        events = list(_extract_all_entries(
+            'anthropic', object(), image_paths, 'some-model', batch_size,
+            all_entries, non_logbook, unparseable, concurrency=concurrency,
+        ))
+    return events, all_entries, non_logbook, unparseable
+
+
+class TestExtractAllEntries:
+    def test_entries_collected_in_batch_order_when_concurrent(self):
+        paths = [Path(f"p{i}.jpg") for i in range(7)]
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            first = batch_files[0].name
+            return _result([_entry('2024-01-01', f"entry from {first}")])
+
+        _, entries, _, _ = _run(paths, 3, fake, concurrency=3)
+
+        assert [e['text'] for e in entries] == [
+            'entry from p0.jpg', 'entry from p2.jpg', 'entry from p4.jpg',
+        ]
+
+    def test_carry_forward_context_only_sent_when_serial(self):
+        paths = [Path(f"p{i}.jpg") for i in range(5)]
+        contexts = []
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            contexts.append(prior_context_text)
+            return _result([_entry('2024-01-01', f"entry {batch_files[0].name}")])
+
+        _run(paths, 3, fake, concurrency=1)
+        assert contexts[0] is None
+        assert contexts[1] and 'entry p0.jpg' in contexts[1]
+
+        contexts.clear()
+        _run(paths, 3, fake, concurrency=2)
+        assert contexts == [None, None]
+
+    def test_next_batch_images_prefetched_while_current_in_flight(self):
+        paths = [Path(f"p{i}.jpg") for i in range(5)]
+        prefetched = []
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            prefetched.append(kwargs.get('prefetched_images'))
+            return _result()
+
+        _run(paths, 3, fake)
+
+        assert prefetched[0] is None
+        assert [f.result() for f in prefetched[1]] == ['/9g='] * 3
+
+    def test_failed_batch_marks_pages_unparseable(self):
+        paths = [Path(f"p{i}.jpg") for i in range(3)]
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            raise RuntimeError('boom')
+
+        events, entries, _, unparseable = _run(paths, 3, fake, concurrency=2)
+
+        assert entries == []
+        assert unparseable == {0, 1, 2}
+        assert any(e['type'] == 'error' for e in events)
+
+    def test_truncated_batch_is_split_and_retried(self):
+        paths = [Path(f"p{i}.jpg") for i in range(4)]
+        calls = []
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            calls.append([f.name for f in batch_files])
+            if len(batch_files) == 4:
+                return _result(truncated=True)
+            return _result([_entry('2024-01-01', f"entry {batch_files[0].name}")])
+
+        _, entries, _, _ = _run(paths, 4, fake)
+
+        assert calls == [
+            ['p0.jpg', 'p1.jpg', 'p2.jpg', 'p3.jpg'],
+            ['p0.jpg', 'p1.jpg'],
+            ['p1.jpg', 'p2.jpg', 'p3.jpg'],
+        ]
+        assert len(entries) == 2
+
+    def test_split_batch_keeps_page_numbers_when_concurrent(self):
+        paths = [Path(f"p{i}.jpg") for i in range(7)]
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            names = [f.name for f in batch_files]
+            if names[0] == 'p0.jpg' and len(names) == 4:
+                return _result(truncated=True)
+            return _result([_entry('2024-01-01', name, page=i) for i, name in enumerate(names)])
+
+        _, entries, _, _ = _run(paths, 4, fake, concurrency=2)
+
+        assert {e['text'] for e in entries} == {f"p{i}.jpg" for i in range(7)}
+        for e in entries:
+            assert e['text'] == f"p{e['page_start']}.jpg"
+
+    def test_duplicate_overlap_entry_keeps_longer_text(self):
+        paths = [Path(f"p{i}.jpg") for i in range(3)]
+        head = 'Annual inspection completed IAW FAR 43 Appendix D, aircraft found airworthy. '
+        short_text = head + 'Signed'
+        long_text = head + 'Signed A. Mechanic A&P 1234567'
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            if batch_files[0].name == 'p0.jpg':
+                return _result([_entry('2024-01-01', short_text, page=1)])
+            return _result([_entry('2024-01-01', long_text, page=0)])
+
+        _, entries, _, _ = _run(paths, 2, fake)
+
+        assert len(entries) == 1
+        assert entries[0]['text'] == long_text
+
+    def test_null_page_indices_default_to_batch_page(self):
+        paths = [Path(f"p{i}.jpg") for i in range(4)]
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            if batch_files[0].name == 'p0.jpg':
+                return _result([_entry('2024-01-01', 'Oil changed')])
+            return _result([
+                {'date': '2024-02-01', 'text': 'Tire replaced', 'page_start': None, 'page_end': None},
+                {'date': '2024-03-01', 'text': 'Annual', 'page_start': 1},
+            ])
+
+        events, entries, _, unparseable = _run(paths, 2, fake)
+
+        assert [(e['text'], e['page_start'], e['page_end']) for e in entries] == [
+            ('Oil changed', 0, 0), ('Tire replaced', 1, 1), ('Annual', 2, 2),
+        ]
+        assert unparseable == set()
+        assert not any(e['type'] == 'error' for e in events)
+
+    def test_output_pressure_rebatches_remaining_pages_without_overlap_repeats(self):
+        paths = [Path(f"p{i}.jpg") for i in range(7)]
+        calls = []
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            calls.append([f.name for f in batch_files])
+            return _result(output_tokens=15000 if len(calls) == 1 else 10)
+
+        _run(paths, 3, fake)
+
+        assert calls == [
+            ['p0.jpg', 'p1.jpg', 'p2.jpg'],
+            ['p2.jpg'], ['p3.jpg'], ['p4.jpg'], ['p5.jpg'], ['p6.jpg'],
+        ]
+
+    def test_output_pressure_rebatch_keeps_page_numbers_when_concurrent(self):
+        # p0-p3 is truncated and split while p3-p6 is in flight, so the queue
+        # holds p1-p3 then p6-p9; the re-batch must not join p3 and p6.
+        paths = [Path(f"p{i}.jpg") for i in range(10)]
+        calls = []
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            names = [f.name for f in batch_files]
+            calls.append(names)
+            if names == ['p0.jpg', 'p1.jpg', 'p2.jpg', 'p3.jpg']:
+                return _result(truncated=True)
+            entries = [_entry('2024-01-01', name, page=i) for i, name in enumerate(names)]
+            return _result(entries, output_tokens=15000 if names[0] == 'p3.jpg' else 10)
+
+        _, entries, _, _ = _run(paths, 4, fake, concurrency=2)
+
+        # Calls run on worker threads, so compare them regardless of order
+        assert sorted(calls) == sorted([
+            ['p0.jpg', 'p1.jpg', 'p2.jpg', 'p3.jpg'], ['p3.jpg', 'p4.jpg', 'p5.jpg', 'p6.jpg'],
+            ['p0.jpg', 'p1.jpg'],
+            ['p1.jpg', 'p2.jpg'], ['p3.jpg'], ['p6.jpg', 'p7.jpg'], ['p8.jpg', 'p9.jpg'],
+        ])
+        assert {e['text'] for e in entries} == {f"p{i}.jpg" for i in range(10)}
+        for e in entries:
+            assert e['text'] == f"p{e['page_start']}.jpg"
+
+    def test_rebatch_sorts_and_breaks_at_gaps(self):
+        from health.logbook_import import _rebatch_work
+
+        p = [Path(f"p{i}.jpg") for i in range(16)]
+        queue = [(14, p[14:16], False), (3, p[3:6], True), (5, p[5:7], False)]
+
+        assert _rebatch_work(queue, 3) == [
+            (3, p[3:6], False), (6, p[6:7], False), (14, p[14:16], False),
+        ]
+
+
+class TestMakeBatches:
+    def test_default_overlap_is_one_page(self):
+        from health.logbook_import import _make_batches
+
+        batches = _make_batches(list(range(7)), 3)
+        assert [off for off, _ in batches] == [0, 2, 4]
+
+    def test_wider_overlap(self):
+        from health.logbook_import import _make_batches
+
+        batches = _make_batches(list(range(7)), 4, overlap=2)
+        assert batches == [(0, [0, 1, 2, 3]), (2, [2, 3, 4, 5]), (4, [4, 5, 6])]
+
+    def test_overlap_never_stalls_small_batches(self):
+        from health.logbook_import import _make_batches
+
+        assert len(_make_batches(list(range(4)), 1, overlap=2)) == 4
+        assert [off for off, _ in _make_batches(list(range(4)), 2, overlap=2)] == [0, 1, 2]
+
+    def test_token_budget_ends_batches_early(self, tmp_path):
+        from health.logbook_import import _make_batches
+
+        pages = []
+        for i, size in enumerate([(100, 100)] * 2 + [(3000, 4000)] * 4):
+            page = tmp_path / f"p{i}.png"
+            page.write_bytes(_png_header(*size))
+            pages.append(page)
+
+        batches = _make_batches(pages, 10, token_budget=3500)
+        assert [(off, len(files)) for off, files in batches] == [(0, 4), (3, 2), (4, 2)]
+        assert _make_batches(pages, 10) == [(0, pages)]
+
+
+class TestExtractAllEntriesBatched:
+    def _message(self, entries, stop_reason='end_turn'):
+        msg = MagicMock()
+        msg.stop_reason = stop_reason
+        msg.content = [MagicMock(text=json.dumps({
+            'entries': entries, 'non_logbook_pages': [], 'unparseable_pages': [],
+        }))]
+        msg.usage.output_tokens = 10
+        return msg
+
+    def test_results_mapped_back_to_batch_offsets(self):
+        from health.logbook_import import _extract_all_entries_batched
+
+        paths = [Path(f"p{i}.jpg") for i in range(5)]
+        client = MagicMock()
+        client.messages.batches.create.return_value = MagicMock(id='mb_1', processing_status='ended')
+        client.messages.batches.results.return_value = [
+            MagicMock(custom_id='b1', result=MagicMock(
+                type='succeeded', message=self._message([_entry('2024-02-01', 'second', page=1)]))),
+            MagicMock(custom_id='b0', result=MagicMock(
+                type='succeeded', message=self._message([_entry('2024-01-01', 'first', page=0)]))),
+        ]
+
+        all_entries, unparseable = [], set()
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            list(_extract_all_entries_batched(
+                client, paths, 'some-model', 4, all_entries, set(), unparseable,
+            ))
+
+        requests = client.messages.batches.create.call_args[1]['requests']
+        assert [r['custom_id'] for r in requests] == ['b0', 'b1']
+        assert [(e['text'], e['page_start']) for e in all_entries] == [('first', 0), ('second', 3)]
+        assert unparseable == set()
+
+    def test_errored_batch_marks_pages_unparseable(self):
+        from health.logbook_import import _extract_all_entries_batched
+
+        paths = [Path(f"p{i}.jpg") for i in range(3)]
+        client = MagicMock()
+        client.messages.batches.create.return_value = MagicMock(id='mb_1', processing_status='ended')
+        client.messages.batches.results.return_value = [
+            MagicMock(custom_id='b0', result=MagicMock(type='errored')),
+        ]
+
+        unparseable = set()
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            events = list(_extract_all_entries_batched(
+                client, paths, 'some-model', 4, [], set(), unparseable,
+            ))
+
+        assert unparseable == {0, 1, 2}
+        assert any(e['type'] == 'error' for e in events)
+
+    def test_polling_yields_batch_status_events(self):
+        from health.logbook_import import _extract_all_entries_batched
+
+        def job(status, succeeded):
+            counts = MagicMock(succeeded=succeeded, errored=0, canceled=0, expired=0)
+            return MagicMock(id='mb_1', processing_status=status, request_counts=counts)
+
+        client = MagicMock()
+        client.messages.batches.create.return_value = job('in_progress', 0)
+        client.messages.batches.retrieve.return_value = job('ended', 1)
+        client.messages.batches.results.return_value = [
+            MagicMock(custom_id='b0', result=MagicMock(type='succeeded', message=self._message([]))),
+        ]
+
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='), \
+             patch('health.logbook_import.time.sleep'):
+            events = list(_extract_all_entries_batched(
+                client, [Path('p0.jpg')], 'some-model', 4, [], set(), set(),
+            ))
+
+        statuses = [(e['status'], e['done']) for e in events if e['type'] == 'batch_status']
+        assert statuses == [('in_progress', 0), ('ended', 1)]
+
+
+class TestGetImageB64:
+    def test_prepared_image_reused_until_file_changes(self, tmp_path):
+        from health.logbook_import import _forget_prepared_images, _get_image_b64
+
+        page = tmp_path / "p0.jpg"
+        page.write_bytes(b'\xff\xd8')
+
+        with patch('health.logbook_import._reencode_image', return_value=b'\xff\xd8') as prep:
+            first = _get_image_b64(page)
+            assert _get_image_b64(page) == first
+            assert prep.call_count == 1
+
+            page.write_bytes(b'\xff\xd8\xff')
+            os.utime(page, ns=(1, 1))
+            _get_image_b64(page)
+            assert prep.call_count == 2
+
+    def test_cache_bounded_by_total_size(self, tmp_path):
+        from health.logbook_import import _get_image_b64
+
+        pages = [tmp_path / f"p{i}.jpg" for i in range(3)]
+        for page in pages:
+            page.write_bytes(b'\xff\xd8')
+
+        # 300 raw bytes encode to 400 characters; two pages fit, three do not
+        with patch('health.logbook_import._IMAGE_CACHE_MAX_BYTES', 900), \
+             patch('health.logbook_import._reencode_image', return_value=b'\xff' * 300) as prep:
+            for page in pages:
+                _get_image_b64(page)
+            _get_image_b64(pages[2])
+            _get_image_b64(pages[0])
+
+        assert prep.call_count == 4
+
+    def test_pages_dropped_when_import_finishes(self, tmp_path):
+        from health.logbook_import import _get_image_b64, _with_provider_cleanup
+
+        pages = [tmp_path / "p0.jpg", tmp_path / "p1.jpg"]
+        for page in pages:
+            page.write_bytes(b'\xff\xd8')
+
+        with patch('health.logbook_import._reencode_image', return_value=b'\xff\xd8') as prep:
+            _get_image_b64(pages[0])
+            _get_image_b64(pages[1])
+            list(_with_provider_cleanup(iter(()), 'litellm', object(), pages[:1]))
+            _get_image_b64(pages[0])
+            _get_image_b64(pages[1])
+
+        assert prep.call_count == 3
+
+
+@pytest.mark.django_db
+class TestRunImport:
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path / 'media')
+        settings.LOGBOOK_IMPORT_CACHE_DIR = ''
+
+    def _pages(self, tmp_path, n):
+        pages = []
+        for i in range(n):
+            page = tmp_path / f"p{i}.jpg"
+            page.write_bytes(b'\xff\xd8\xff\xe0' + b'X' * (100 + i))
+            pages.append(page)
+        return pages
+
+    def _import(self, aircraft, pages, fake_call_model=None, **kwargs):
+        from health.logbook_import import run_import
+
+        with patch('health.logbook_import._call_model', side_effect=fake_call_model), \
+             patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            return list(run_import(
+                aircraft=aircraft, image_paths=pages, collection_name='Logs',
+                doc_name='Airframe log', provider='ollama', model='some-model', **kwargs,
+            ))
+
+    def test_entries_and_images_saved(self, aircraft, tmp_path):
+        from health.models import DocumentImage, LogbookEntry
+
+        pages = self._pages(tmp_path, 2)
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            return _result([
+                _entry('2024-01-01', 'Oil changed', page=0),
+                _entry('2024-02-01', 'Annual inspection', page=1),
+                _entry(None, 'No date on this one', page=1),
+            ])
+
+        events = self._import(aircraft, pages, fake)
+
+        complete = events[-1]
+        assert complete['type'] == 'complete'
+        assert complete['entries_created'] == 2
+        assert complete['entries_skipped'] == 1
+
+        entries = LogbookEntry.objects.filter(aircraft=aircraft).order_by('date')
+        assert [(e.text, e.page_number) for e in entries] == [
+            ('Oil changed', 1), ('Annual inspection', 2),
+        ]
+        assert all(e.log_image_id == entries[0].log_image_id for e in entries)
+
+        images = DocumentImage.objects.filter(document_id=complete['document_id'])
+        assert [i.order for i in images] == [0, 1]
+        assert [i.file_size for i in images] == [104, 105]
+
+    def test_entries_inserted_in_bulk(self, aircraft, tmp_path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from health.logbook_import import _BULK_CREATE_BATCH_SIZE
+        from health.models import LogbookEntry
+
+        n = _BULK_CREATE_BATCH_SIZE * 2 + 50
+        pages = self._pages(tmp_path, 1)
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            return _result([_entry('2024-01-01', f"Entry {i}") for i in range(n)])
+
+        with CaptureQueriesContext(connection) as ctx:
+            events = self._import(aircraft, pages, fake)
+
+        inserts = [q for q in ctx.captured_queries
+                   if q['sql'].startswith('INSERT') and LogbookEntry._meta.db_table in q['sql']]
+        # The backend may cap rows per INSERT below our batch size (SQLite's
+        # parameter limit), exactly as bulk_create does.
+        fields = LogbookEntry._meta.concrete_fields
+        batch = min(_BULK_CREATE_BATCH_SIZE, connection.ops.bulk_batch_size(fields, [None] * n))
+        assert events[-1]['entries_created'] == n
+        assert len(inserts) == math.ceil(n / batch)
+        assert LogbookEntry.objects.filter(aircraft=aircraft).count() == n
+
+    def test_upload_only_creates_images_without_entries(self, aircraft, tmp_path):
+        from health.models import DocumentImage, LogbookEntry
+
+        pages = self._pages(tmp_path, 3)
+        events = self._import(aircraft, pages, upload_only=True)
+
+        assert events[-1]['entries_created'] == 0
+        assert DocumentImage.objects.filter(document_id=events[-1]['document_id']).count() == 3
+        assert not LogbookEntry.objects.filter(aircraft=aircraft).exists()
+
+    def test_failed_transaction_removes_stored_images(self, aircraft, tmp_path):
+        from health.models import Document, DocumentImage, LogbookEntry
+
+        pages = self._pages(tmp_path, 2)
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            return _result([_entry('2024-01-01', 'Oil changed', page=0)])
+
+        with patch.object(LogbookEntry.objects, 'bulk_create', side_effect=RuntimeError('db down')), \
+             pytest.raises(RuntimeError):
+            self._import(aircraft, pages, fake)
+
+        assert not Document.objects.filter(aircraft=aircraft).exists()
+        assert not DocumentImage.objects.exists()
+        assert not [p for p in (tmp_path / 'media').rglob('*') if p.is_file()]
+
+    @pytest.mark.parametrize('upload_only', [False, True])
+    def test_abandoned_upload_removes_stored_images(self, aircraft, tmp_path, upload_only):
+        from health.logbook_import import run_import
+        from health.models import DocumentImage
+
+        pages = self._pages(tmp_path, 3)
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, **kwargs):
+            return _result()
+
+        with patch('health.logbook_import._call_model', side_effect=fake), \
+             patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            events = run_import(
+                aircraft=aircraft, image_paths=pages, collection_name='Logs',
+                doc_name='Airframe log', provider='ollama', model='some-model',
+                upload_only=upload_only,
+            )
+            for event in events:
+                if event['type'] == 'image':
+                    break
+            assert [p for p in (tmp_path / 'media').rglob('*') if p.is_file()]
+            events.close()
+
+        assert not DocumentImage.objects.exists()
+        assert not [p for p in (tmp_path / 'media').rglob('*') if p.is_file()]
+
+
+class TestResponseCache:
+    @pytest.fixture
+    def page(self, settings, tmp_path):
+        settings.LOGBOOK_IMPORT_CACHE_DIR = str(tmp_path / 'cache')
+        page = tmp_path / "p0.jpg"
+        page.write_bytes(b'\xff\xd8\xff\xe0' + b'X' * 16)
+        return page
+
+    def test_repeat_call_served_from_cache(self, page):
+        from health.logbook_import import _call_model_cached
+
+        live = _result([_entry('2024-01-01', 'Oil changed')])
+        with patch('health.logbook_import._call_model', return_value=live) as call:
+            first = _call_model_cached('anthropic', None, [page], 'some-model')
+            second = _call_model_cached('anthropic', None, [page], 'some-model')
+
+        assert call.call_count == 1
+        assert first == live
+        assert second == dict(live, from_cache=True)
+
+    def test_hit_does_not_report_prompt_cache_usage(self, page):
+        from health.logbook_import import _call_model_cached
+
+        live = dict(_result(), cache_read_tokens=1200)
+        with patch('health.logbook_import._call_model', return_value=live):
+            _call_model_cached('anthropic', None, [page], 'some-model')
+            hit = _call_model_cached('anthropic', None, [page], 'some-model')
+
+        assert hit['from_cache']
+        assert 'cache_read_tokens' not in hit
+
+    def test_different_model_context_or_content_misses_cache(self, page):
+        from health.logbook_import import _call_model_cached
+
+        with patch('health.logbook_import._call_model', return_value=_result()) as call:
+            _call_model_cached('anthropic', None, [page], 'some-model')
+            _call_model_cached('anthropic', None, [page], 'other-model')
+            _call_model_cached('anthropic', None, [page], 'some-model', prior_context_text='ctx')
+            page.write_bytes(b'\xff\xd8\xff\xe0' + b'Y' * 16)
+            os.utime(page, ns=(1, 1))
+            _call_model_cached('anthropic', None, [page], 'some-model')
+
+        assert call.call_count == 4
+
+    def test_disabled_when_cache_dir_empty(self, page, settings):
+        from health.logbook_import import _call_model_cached
+
+        settings.LOGBOOK_IMPORT_CACHE_DIR = ''
+        with patch('health.logbook_import._call_model', return_value=_result()) as call:
+            _call_model_cached('anthropic', None, [page], 'some-model')
+            _call_model_cached('anthropic', None, [page], 'some-model')
+
+        assert call.call_count == 2
+
+    def _age(self, path, seconds):
+        stale = os.stat(path).st_mtime - seconds
+        os.utime(path, (stale, stale))
+
+    def test_prune_removes_only_files_past_ttl(self, page, settings):
+        from health.logbook_import import _RESPONSE_CACHE_TTL, prune_response_cache
+
+        cache_dir = Path(settings.LOGBOOK_IMPORT_CACHE_DIR)
+        (cache_dir / 'ab').mkdir(parents=True)
+        old = cache_dir / 'ab' / ('ab' + '1' * 62 + '.json')
+        old_tmp = cache_dir / 'ab' / ('ab' + '2' * 62 + '.140123.tmp')
+        fresh = cache_dir / 'ab' / ('ab' + '3' * 62 + '.json')
+        for path in (old, old_tmp, fresh):
+            path.write_text('{}')
+        self._age(old, _RESPONSE_CACHE_TTL + 60)
+        self._age(old_tmp, _RESPONSE_CACHE_TTL + 60)
+
+        assert prune_response_cache() == 2
+        assert not old.exists()
+        assert not old_tmp.exists()
+        assert fresh.exists()
+
+    def test_prune_leaves_files_the_cache_did_not_write(self, page, settings):
+        from health.logbook_import import _RESPONSE_CACHE_TTL, prune_response_cache
+
+        cache_dir = Path(settings.LOGBOOK_IMPORT_CACHE_DIR)
+        (cache_dir / 'ab').mkdir(parents=True)
+        (cache_dir / 'uploads').mkdir()
+        foreign = [
+            cache_dir / 'notes.txt',
+            cache_dir / ('ab' + '1' * 62 + '.json'),           # not in a shard
+            cache_dir / 'ab' / 'photo.jpg',
+            cache_dir / 'ab' / ('cd' + '1' * 62 + '.json'),    # wrong shard
+            cache_dir / 'uploads' / ('up' + '1' * 62 + '.json'),
+        ]
+        for path in foreign:
+            path.write_text('{}')
+            self._age(path, _RESPONSE_CACHE_TTL + 60)
+
+        assert prune_response_cache() == 0
+        assert all(path.exists() for path in foreign)
+
+    def test_prune_command(self, page, settings):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        cache_dir = Path(settings.LOGBOOK_IMPORT_CACHE_DIR)
+        (cache_dir / 'ab').mkdir(parents=True)
+        old = cache_dir / 'ab' / ('ab' + '1' * 62 + '.json')
+        recent = cache_dir / 'ab' / ('ab' + '2' * 62 + '.json')
+        old.write_text('{}')
+        recent.write_text('{}')
+        self._age(old, 3 * 24 * 3600)
+        self._age(recent, 24 * 3600)
+
+        out = StringIO()
+        call_command('prune_logbook_cache', '--days', '2', stdout=out)
+
+        assert 'Removed 1 cache file(s)' in out.getvalue()
+        assert not old.exists()
+        assert recent.exists()
+
+    def test_prune_command_without_cache_dir(self, settings):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        settings.LOGBOOK_IMPORT_CACHE_DIR = ''
+        out = StringIO()
+        call_command('prune_logbook_cache', stdout=out)
+
+        assert 'nothing to prune' in out.getvalue()
+
+    def test_degraded_result_not_cached(self, page):
+        from health.logbook_import import _call_model_cached
+
+        degraded = dict(_result(), degraded=True)
+        with patch('health.logbook_import._call_model', return_value=degraded) as call:
+            _call_model_cached('ollama', None, [page], 'llava')
+            _call_model_cached('ollama', None, [page], 'llava')
+
+        assert call.call_count == 2
+
+
+class TestCallOllama:
+    def test_posts_through_shared_session(self):
+        from health.logbook_import import _call_ollama
+
+        session = MagicMock()
+        session.post.return_value.content = json.dumps({
+            'message': {'content': json.dumps(_result([_entry('2024-01-01', 'Oil changed')])['data'])},
+            'done_reason': 'stop',
+            'eval_count': 42,
+        }).encode()
+
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            for _ in range(2):
+                result = _call_ollama(('http://ollama:11434', session), [Path('p0.jpg')], 'llava')
+
+        assert session.post.call_count == 2
+        url = session.post.call_args.args[0]
+        body = json.loads(session.post.call_args.kwargs['data'])
+        assert url == 'http://ollama:11434/api/chat'
+        assert body['model'] == 'llava'
+        assert body['messages'][1]['images'] == ['/9g=']
+        assert result['output_tokens'] == 42
+        assert not result['truncated']
+        assert result['data']['entries'][0]['text'] == 'Oil changed'
+        assert not result['degraded']
+
+    def test_invalid_json_marked_degraded(self):
+        from health.logbook_import import _call_ollama
+
+        session = MagicMock()
+        session.post.return_value.content = json.dumps({
+            'message': {'content': 'not json'}, 'done_reason': 'stop', 'eval_count': 1,
+        }).encode()
+
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            result = _call_ollama(('http://ollama:11434', session), [Path('p0.jpg')], 'llava')
+
+        assert result['degraded']
+        assert result['data']['entries'] == []
+
+
+class TestAnthropicRequest:
+    def test_shipped_system_prefix_marked_cacheable(self):
+        from health.logbook_import import (
+            EXTRACT_OUTPUT_SCHEMA, EXTRACT_SYSTEM_PROMPT, _build_anthropic_request,
+        )
+
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            params = _build_anthropic_request([Path('p0.jpg')], 'some-model')
+
+        prompt_block, schema_block = params['system']
+        assert prompt_block == {'type': 'text', 'text': EXTRACT_SYSTEM_PROMPT}
+        assert json.dumps(EXTRACT_OUTPUT_SCHEMA) in schema_block['text']
+        assert schema_block['cache_control'] == {'type': 'ephemeral'}
+        # The prompt alone is below the 1024-token minimum Anthropic will
+        # cache; with the schema the cached prefix reaches it
+        assert len(EXTRACT_SYSTEM_PROMPT) // 4 < 1024
+        assert (len(prompt_block['text']) + len(schema_block['text'])) // 4 >= 1024
+
+    def test_short_system_prefix_not_marked(self):
+        from health.logbook_import import _build_anthropic_request
+
+        with patch('health.logbook_import.EXTRACT_SYSTEM_PROMPT', 'Extract the entries.'), \
+             patch('health.logbook_import._get_image_b64', return_value='/9g='):
+            params = _build_anthropic_request([Path('p0.jpg')], 'some-model')
+
+        assert not any('cache_control' in block for block in params['system'])
+
+    def test_cache_read_tokens_reported(self):
+        from health.logbook_import import _parse_anthropic_response
+
+        response = MagicMock(stop_reason='end_turn')
+        response.usage.output_tokens = 120
+        response.usage.cache_read_input_tokens = 1800
+        response.content[0].text = json.dumps(_result()['data'])
+
+        result = _parse_anthropic_response(response)
+
+        assert result['cache_read_tokens'] == 1800
+        assert result['output_tokens'] == 120
+
+
+class TestIterInThread:
+    def test_yields_events_in_order(self):
+        from health.logbook_import import _iter_in_thread
+
+        events = ({'type': 'info', 'message': str(i)} for i in range(200))
+
+        assert [e['message'] for e in _iter_in_thread(events)] == [str(i) for i in range(200)]
+
+    def test_producer_exception_reraised(self):
+        from health.logbook_import import _iter_in_thread
+
+        def events():
+            yield {'type': 'info', 'message': 'first'}
+            raise RuntimeError('boom')
+
+        consumer = _iter_in_thread(events())
+        assert next(consumer)['message'] == 'first'
+        with pytest.raises(RuntimeError, match='boom'):
+            next(consumer)
+
+    def test_closing_consumer_stops_producer(self):
+        import threading
+        from health.logbook_import import _iter_in_thread
+
+        closed = threading.Event()
+
+        def events():
+            try:
+                while True:
+                    yield {'type': 'info', 'message': 'tick'}
+            finally:
+                closed.set()
+
+        consumer = _iter_in_thread(events())
+        next(consumer)
+        consumer.close()
+
+        assert closed.wait(timeout=5)
+
+    def test_provider_released_only_after_call_in_progress_returns(self):
+        import threading
+        from health.logbook_import import _iter_in_thread, _with_provider_cleanup
+
+        in_call, release, closed = threading.Event(), threading.Event(), threading.Event()
+        order = []
+
+        def extraction():
+            yield {'type': 'info', 'message': 'first'}
+            in_call.set()
+            release.wait(timeout=5)
+            order.append('call returned')
+            yield {'type': 'info', 'message': 'second'}
+
+        session = MagicMock()
+        session.close.side_effect = lambda: (order.append('session closed'), closed.set())
+
+        consumer = _iter_in_thread(
+            _with_provider_cleanup(extraction(), 'ollama', ('http://ollama:11434', session), [])
+        )
+        next(consumer)
+        assert in_call.wait(timeout=5)
+        consumer.close()
+
+        assert order == []
+        release.set()
+        assert closed.wait(timeout=5)
+        assert order == ['call returned', 'session closed']
+
+
+def _jpeg_header(width, height):
+    app0 = b'\xff\xe0' + (16).to_bytes(2, 'big') + b'JFIF\x00' + b'\x01\x01\x00' + b'\x00\x01' * 2 + b'\x00\x00'
+    sof0 = (b'\xff\xc0' + (17).to_bytes(2, 'big') + b'\x08'
+            + height.to_bytes(2, 'big') + width.to_bytes(2, 'big') + b'\x03' + b'\x00' * 9)
+    return b'\xff\xd8' + app0 + sof0 + b'\xff\xda'
+
+
+def _png_header(width, height):
+    return (b'\x89PNG\r\n\x1a\n' + (13).to_bytes(4, 'big') + b'IHDR'
+            + width.to_bytes(4, 'big') + height.to_bytes(4, 'big') + b'\x08\x02\x00\x00\x00')
+
+
+class TestPeekImageSize:
+    def test_jpeg(self, tmp_path):
+        from health.logbook_import import _peek_image_size
+
+        page = tmp_path / 'p.jpg'
+        page.write_bytes(_jpeg_header(4000, 3000))
+
+        assert _peek_image_size(page) == (4000, 3000)
+
+    def test_png(self, tmp_path):
+        from health.logbook_import import _peek_image_size
+
+        page = tmp_path / 'p.png'
+        page.write_bytes(_png_header(800, 1200))
+
+        assert _peek_image_size(page) == (800, 1200)
+
+    def test_unknown_format(self, tmp_path):
+        from health.logbook_import import _peek_image_size
+
+        page = tmp_path / 'p.tif'
+        page.write_bytes(b'II*\x00' + b'\x00' * 32)
+
+        assert _peek_image_size(page) is None
+
+    def test_small_page_passed_through_without_decoding(self, tmp_path):
+        from health.logbook_import import _get_image_bytes
+
+        page = tmp_path / 'p.jpg'
+        page.write_bytes(_jpeg_header(1000, 1400))
+
+        with patch.dict('sys.modules', {'PIL': None}):
+            assert _get_image_bytes(page) == page.read_bytes()
+
+
+class TestDuplicatePages:
+    def test_identical_images_collapsed(self, tmp_path):
+        from health.logbook_import import _dedupe_pages
+
+        paths = []
+        for i, content in enumerate([b'a', b'b', b'a', b'c', b'b']):
+            path = tmp_path / f"p{i}.jpg"
+            path.write_bytes(content)
+            paths.append(path)
+
+        unique, groups = _dedupe_pages(paths)
+
+        assert unique == [paths[0], paths[1], paths[3]]
+        assert groups == [[0, 2], [1, 4], [3]]
+
+    def test_unreadable_file_keeps_every_page(self):
+        from health.logbook_import import _dedupe_pages
+
+        paths = [Path('missing0.jpg'), Path('missing1.jpg')]
+
+        assert _dedupe_pages(paths) == (paths, [[0], [1]])
+
+    def test_indices_restored_onto_original_pages(self):
+        from health.logbook_import import _restore_page_indices
+
+        groups = [[0, 2], [1, 4], [3]]
+        entries = [_entry('2024-01-01', 'a', page=1), _entry('2024-02-01', 'b', page=2)]
+        non_logbook, unparseable = {0}, {1}
+
+        _restore_page_indices(groups, entries, non_logbook, unparseable)
+
+        assert [(e['page_start'], e['page_end']) for e in entries] == [(1, 1), (3, 3)]
+        assert non_logbook == {0, 2}
+        assert unparseable == {1, 4}
+
+
+class TestCheckExtractShape:
+    @pytest.mark.parametrize('data', [
+        {'entries': [], 'non_logbook_pages': [], 'unparseable_pages': []},
+        {'entries': [{'date': None, 'text': 'x', 'page_start': 0, 'page_end': None}]},
+        {},
+    ])
+    def test_accepts(self, data):
+        from health.logbook_import import _check_extract_shape
+
+        assert _check_extract_shape(data)
+
+    @pytest.mark.parametrize('data', [
+        [],
+        {'entries': {'date': '2024-01-01'}},
+        {'entries': ['not an entry']},
+        {'entries': [{'text': 'x', 'page_start': '2'}]},
+        {'entries': [{'text': 42, 'page_start': 0}]},
+        {'entries': [{'text': ['x'], 'page_start': 0}]},
+        {'entries': [], 'non_logbook_pages': [1.5]},
+        {'entries': [], 'unparseable_pages': [True]},
+    ])
+    def test_rejects(self, data):
+        from health.logbook_import import _check_extract_shape
+
+        assert not _check_extract_shape(data)
+
+
+class TestRateLimiter:
+    def test_burst_allowed_then_throttled(self):
+        from health.logbook_import import _RateLimiter
+
+        limiter = _RateLimiter(rpm=2, tpm=0)
+        with patch('health.logbook_import.time.sleep') as sleep:
+            limiter.acquire(0)
+            limiter.acquire(0)
+            sleep.assert_not_called()
+
+            sleep.side_effect = lambda s: setattr(limiter, '_requests', 1.0)
+            limiter.acquire(0)
+
+        assert sleep.call_count == 1
+        assert 0 < sleep.call_args.args[0] <= 30
+
+    def test_token_bucket_waits_for_large_request(self):
+        from health.logbook_import import _RateLimiter
+
+        limiter = _RateLimiter(rpm=0, tpm=6000)
+        limiter.acquire(5000)
+        with patch('health.logbook_import.time.sleep',
+                   side_effect=lambda s: setattr(limiter, '_tokens', 6000.0)) as sleep:
+            limiter.acquire(50000)  # capped at the bucket size
+
+        wait = sleep.call_args.args[0]
+        assert 49 < wait <= 50
+
+    def test_disabled_without_limits(self, settings):
+        from health.logbook_import import _anthropic_rate_limiter
+
+        settings.ANTHROPIC_REQUESTS_PER_MINUTE = 0
+        settings.ANTHROPIC_INPUT_TOKENS_PER_MINUTE = 0
+
+        assert _anthropic_rate_limiter() is None
+
+    def test_input_token_estimate_counts_images(self):
+        from health.logbook_import import _IMAGE_TOKEN_ESTIMATE, _build_anthropic_request, _estimate_input_tokens
+
+        with patch('health.logbook_import._get_image_b64', return_value='/9g=' * 1000):
+            one = _estimate_input_tokens(_build_anthropic_request([Path('p0.jpg')], 'm'))
+            three = _estimate_input_tokens(_build_anthropic_request(
+                [Path('p0.jpg'), Path('p1.jpg'), Path('p2.jpg')], 'm'))
+
+        assert _IMAGE_TOKEN_ESTIMATE * 2 < three - one < _IMAGE_TOKEN_ESTIMATE * 2 + 100
+
+
+class TestEncodeFileB64:
+    @pytest.mark.parametrize('size', [0, 1, 2, 3, 1000, 3 * 85 * 1024 + 1, 600_001])
+    def test_matches_one_shot_encoding(self, tmp_path, size):
+        import base64
+        from health.logbook_import import _encode_file_b64
+
+        path = tmp_path / 'p.jpg'
+        path.write_bytes(os.urandom(size))
+
+        assert _encode_file_b64(path) == base64.b64encode(path.read_bytes()).decode('ascii')
+
+    def test_small_page_streamed_from_disk(self, tmp_path):
+        import base64
+        from health.logbook_import import _get_image_b64
+
+        page = tmp_path / 'p.jpg'
+        page.write_bytes(_jpeg_header(1000, 1400) + os.urandom(5000))
+
+        assert _get_image_b64(page) == base64.b64encode(page.read_bytes()).decode('ascii')
+
+
+@pytest.mark.django_db
+class TestRunImportJob:
+    def test_event_writes_are_batched(self, aircraft, tmp_path):
+        from health.logbook_import import _JOB_SAVE_EVERY, run_import_job
+        from health.models import ImportJob
+
+        job = ImportJob.objects.create(aircraft=aircraft, job_type='logbook')
+        n_info = _JOB_SAVE_EVERY * 2 + 5
+
+        def fake_run_import(**kwargs):
+            for i in range(n_info):
+                yield {'type': 'info', 'message': f"step {i}"}
+            yield {'type': 'complete', 'message': 'done', 'entries_created': 0}
+
+        real_append = ImportJob.append_events
+        writes = []
+
+        def counting_append(self, events):
+            writes.append(len(events))
+            return real_append(self, events)
+
+        with patch('health.logbook_import.run_import', side_effect=fake_run_import), \
+             patch('health.logbook_import.time.monotonic', return_value=0.0), \
+             patch.object(ImportJob, 'append_events', counting_append):
+            run_import_job(job.id, str(tmp_path / 'staging'), [])
+
+        job.refresh_from_db()
+        assert job.status == 'completed'
+        assert job.result['type'] == 'complete'
+        # two full buffers, then the remainder flushed with the complete event
+        assert writes[:3] == [_JOB_SAVE_EVERY, _JOB_SAVE_EVERY, 6]
+        events = job.events_after(0)
+        assert [e['message'] for e in events[:n_info]] == [f"step {i}" for i in range(n_info)]
+        assert events[-1]['type'] == 'complete'
+        assert job.events_after(n_info) == [events[-1]]
+
+    def test_events_survive_failed_db_phase(self, aircraft, tmp_path):
+        from django.db import connection, transaction
+
+        from health.logbook_import import _JOB_SAVE_EVERY, run_import_job
+        from health.models import ImportJob
+
+        job = ImportJob.objects.create(aircraft=aircraft, job_type='logbook')
+        outer_depth = len(connection.atomic_blocks)
+
+        def fake_run_import(**kwargs):
+            yield {'type': 'batch', 'message': 'extracting'}
+            with transaction.atomic():
+                for i in range(_JOB_SAVE_EVERY + 1):
+                    yield {'type': 'info', 'message': f"saving {i}"}
+                raise RuntimeError('insert failed')
+
+        real_append = ImportJob.append_events
+        depths = []
+
+        def recording_append(self, events):
+            depths.append(len(connection.atomic_blocks))
+            return real_append(self, events)
+
+        with patch('health.logbook_import.run_import', side_effect=fake_run_import), \
+             patch.object(ImportJob, 'append_events', recording_append):
+            run_import_job(job.id, str(tmp_path / 'staging'), [])
+
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert all(depth == outer_depth for depth in depths)
+        messages = [e['message'] for e in job.events_after(0)]
+        assert messages[:2] == ['extracting', 'saving 0']
+        assert messages[-2] == f"saving {_JOB_SAVE_EVERY}"
+        assert len(messages) == _JOB_SAVE_EVERY + 3
+
+
+class TestParseEntryDate:
+    @pytest.mark.parametrize('value, expected', [
+        ('2024-03-07', (2024, 3, 7)),
+        ('2024-3-7', (2024, 3, 7)),  # unpadded: strptime fallback
+    ])
+    def test_valid(self, value, expected):
+        import datetime
+        from health.logbook_import import _parse_entry_date
+
+        assert _parse_entry_date(value) == datetime.date(*expected)
+
+    @pytest.mark.parametrize('value', ['2024-02-30', '2024-+1-01', '03/07/2024', '2024-13-01'])
+    def test_invalid(self, value):
+        from health.logbook_import import _parse_entry_date
+
+        with pytest.raises(ValueError):
+            _parse_entry_date(value)
+
+
+class TestCallAnthropicRetry:
+    def test_rate_limit_retried_with_jittered_retry_after(self, settings):
+        import anthropic
+        import httpx
+        from health.logbook_import import _RETRY_JITTER, _call_anthropic
+
+        settings.ANTHROPIC_REQUESTS_PER_MINUTE = 0
+        settings.ANTHROPIC_INPUT_TOKENS_PER_MINUTE = 0
+        response = httpx.Response(429, headers={'retry-after': '4'},
+                                  request=httpx.Request('POST', 'https://api.anthropic.com'))
+        rate_limited = anthropic.RateLimitError('slow down', response=response, body=None)
+
+        ok = MagicMock(stop_reason='end_turn')
+        ok.usage.output_tokens = 5
+        ok.usage.cache_read_input_tokens = 0
+        ok.content[0].text = json.dumps(_result()['data'])
+
+        client = MagicMock()
+        client.messages.create.side_effect = [rate_limited, ok]
+
+        with patch('health.logbook_import._get_image_b64', return_value='/9g='), \
+             patch('health.logbook_import.time.sleep') as sleep:
+            result = _call_anthropic(client, [Path('p0.jpg')], 'some-model')
+
+        assert result['output_tokens'] == 5
+        assert client.messages.create.call_count == 2
+        assert 4.0 <= sleep.call_args.args[0] <= 4.0 * (1 + _RETRY_JITTER)
+
+
+class TestFilesApi:
+    def _client(self):
+        client = MagicMock()
+        uploads = iter(f"file_{i}" for i in range(100))
+        client.beta.files.upload.side_effect = lambda **kwargs: MagicMock(id=next(uploads))
+        ok = MagicMock(stop_reason='end_turn')
+        ok.usage.output_tokens = 5
+        ok.usage.cache_read_input_tokens = 0
+        ok.content[0].text = json.dumps(_result()['data'])
+        client.beta.messages.create.return_value = ok
+        return client
+
+    def test_overlap_page_uploaded_once_and_deleted_after(self, settings, tmp_path):
+        from health.logbook_import import _call_anthropic, _delete_uploaded_files
+
+        settings.LOGBOOK_IMPORT_ANTHROPIC_FILES_API = True
+        settings.ANTHROPIC_REQUESTS_PER_MINUTE = 0
+        settings.ANTHROPIC_INPUT_TOKENS_PER_MINUTE = 0
+        pages = []
+        for i in range(3):
+            page = tmp_path / f"p{i}.jpg"
+            page.write_bytes(b'\xff\xd8' + bytes([i]))
+            pages.append(page)
+        client = self._client()
+
+        with patch('health.logbook_import._get_image_bytes', side_effect=lambda p: p.read_bytes()), \
+             patch('health.logbook_import._get_image_b64') as get_b64:
+            _call_anthropic(client, pages[:2], 'some-model')
+            _call_anthropic(client, pages[1:], 'some-model')
+
+        get_b64.assert_not_called()
+        assert client.beta.files.upload.call_count == 3
+        first_upload = client.beta.files.upload.call_args_list[0].kwargs['file']
+        assert first_upload == ('p0.jpg', b'\xff\xd8\x00', 'image/jpeg')
+        client.messages.create.assert_not_called()
+        second = client.beta.messages.create.call_args.kwargs
+        sources = [b['source'] for b in second['messages'][0]['content'] if b['type'] == 'image']
+        assert sources == [{'type': 'file', 'file_id': 'file_1'}, {'type': 'file', 'file_id': 'file_2'}]
+        assert second['betas'] == ['files-api-2025-04-14']
+
+        _delete_uploaded_files(client, pages)
+
+        deleted = {c.args[0] for c in client.beta.files.delete.call_args_list}
+        assert deleted == {'file_0', 'file_1', 'file_2'}
+
+    def test_lookahead_uploads_pages_instead_of_encoding(self, settings, tmp_path):
+        from health.logbook_import import _extract_all_entries
+
+        settings.LOGBOOK_IMPORT_ANTHROPIC_FILES_API = True
+        pages = []
+        for i in range(5):
+            page = tmp_path / f"p{i}.jpg"
+            page.write_bytes(b'\xff\xd8' + bytes([i]))
+            pages.append(page)
+        client = self._client()
+        prefetched = []
+
+        def fake(provider, client, batch_files, model, prior_context_text=None, prefetched_images=None):
+            prefetched.append(prefetched_images and [f.result() for f in prefetched_images])
+            return _result()
+
+        with patch('health.logbook_import._call_model', side_effect=fake), \
+             patch('health.logbook_import._get_image_bytes', side_effect=lambda p: p.read_bytes()), \
+             patch('health.logbook_import._get_image_b64') as get_b64:
+            list(_extract_all_entries('anthropic', client, pages, 'some-model', 3,
+                                      [], set(), set(), concurrency=1))
+
+        get_b64.assert_not_called()
+        assert prefetched[0] is None
+        assert sorted(prefetched[1]) == ['file_0', 'file_1', 'file_2']
+        assert client.beta.files.upload.call_count == 3
+
+
+class TestImportLogbookCommand:
+    def test_unknown_model_rejected_before_any_work(self, tmp_path):
+        # No django_db mark: reaching the aircraft lookup would fail the test
+        from django.core.management import CommandError, call_command
+
+        with pytest.raises(CommandError, match="Unknown model 'no-such-model'"):
+            call_command('import_logbook', str(tmp_path), aircraft='N1', model='no-such-model')
@@ -2,7 +2,10 @@ import datetime
 
 import pytest
 
-from health.models import LogbookEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from health.models import Document, LogbookEntry
 
 pytestmark = pytest.mark.django_db
 
@@ -32,6 +35,26 @@ class TestLogbookEntryViewSetList:
         ids = [r['id'] for r in resp.data['results']]
         assert str(logbook_entry.id) in ids
 
+    def test_query_count_does_not_grow_with_entries(self, owner_client, aircraft):
+        doc = Document.objects.create(aircraft=aircraft, name='Airframe log', doc_type='LOG')
+
+        def add_entry():
+            entry = LogbookEntry.objects.create(
+                aircraft=aircraft, date=datetime.date.today(), text='Oil changed', log_image=doc,
+            )
+            entry.related_documents.add(doc)
+
+        def list_query_count():
+            with CaptureQueriesContext(connection) as ctx:
+                assert owner_client.get('/api/logbook-entries/').status_code == 200
+            return len(ctx.captured_queries)
+
+        add_entry()
+        baseline = list_query_count()
+        for _ in range(5):
+            add_entry()
+        assert list_query_count() == baseline
+
 
 class TestLogbookEntryViewSetDetail:
     def test_owner_gets_200(self, owner_client, logbook_entry):
@@ -588,7 +588,16 @@ class TestImportJob:
 
     def test_events_default_empty_list(self, aircraft):
         job = ImportJob.objects.create(aircraft=aircraft)
-        assert job.events == []
+        assert job.events_after(0) == []
+
+    def test_append_events_keeps_order_across_calls(self, aircraft):
+        job = ImportJob.objects.create(aircraft=aircraft)
+        job.append_events([{'type': 'info', 'message': 'a'}, {'type': 'info', 'message': 'b'}])
+        job.append_events([])
+        job.append_events([{'type': 'error', 'message': 'c'}])
+
+        assert [e['message'] for e in job.events_after(0)] == ['a', 'b', 'c']
+        assert job.events_after(2) == [{'type': 'error', 'message': 'c'}]
 
     def test_str_with_aircraft(self, aircraft):
         job = ImportJob.objects.create(aircraft=aircraft)
@@ -162,6 +162,19 @@ class TestParseDispatch:
             with pytest.raises(ValueError, match='Unrecognized'):
                 parse(Path('/fake/report.pdf'))
 
+    def test_pdf_opened_once(self):
+        """parse() reads text and words from a single open of the PDF."""
+        from health.oil_analysis_parsers import parse
+
+        mock_fitz = self._make_mock_fitz('Random oil lab report with no known identifier')
+
+        with patch.dict(sys.modules, {'fitz': mock_fitz}):
+            with pytest.raises(ValueError):
+                parse(Path('/fake/report.pdf'))
+
+        mock_fitz.open.assert_called_once_with('/fake/report.pdf')
+        mock_fitz.open.return_value.close.assert_called_once()
+
     def test_blackstone_lab_detected_in_text(self):
         """_detect_lab correctly returns 'blackstone' for Blackstone text."""
         from health.oil_analysis_parsers import _detect_lab